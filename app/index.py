@@ -13,17 +13,96 @@ import numpy as np
 
 # system
 import os
+import hashlib
+import tarfile
+import tempfile
+import shutil
+from pathlib import Path
+import sys
+import json
+import io
+import urllib.parse
+import bisect
+import re
+import copy
+import asyncio
+import threading
+import multiprocessing
+import site
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
+
+# sparse matrices
+from scipy import sparse
+
+# monte carlo simulation (module next to this script, see `create_monte_carlo_executor`)
+import montecarlo_worker
+
+# lazy imports
+import time
+import importlib
+import functools
+from typing import TYPE_CHECKING
 
-# brightway
-import bw_graph_tools as bgt
-import bw2io as bi
-import bw2data as bd
-import bw2calc as bc
+
+"""
+dict_import_timings = {
+    'bw2data': 2.83,
+    'bw2calc': 0.41,
+    ...
+}
+"""
+dict_import_timings: dict = {}
+
+
+class lazy_module_class:
+    """
+    Proxy of a module which is only imported on first attribute access (or on `load`).
+
+    Importing the Brightway packages takes several seconds (much longer in Pyodide).
+    With this proxy, the Panel template is rendered first and the packages are imported
+    in the background after the page has loaded (see `preload_modules`), or on first use, whichever comes first.
+    The import duration of every module is stored in `dict_import_timings` and written to the Panel log.
+
+    Notes
+    -----
+    Plotly, pandas and NumPy are imported eagerly, since they are already imported by `pn.extension`.
+
+    Example
+    -------
+    >>> bd = lazy_module_class('bw2data')  # not yet imported
+    >>> bd.projects  # imports bw2data
+    """
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            time_start: float = time.perf_counter()
+            module = importlib.import_module(self._name)
+            dict_import_timings[self._name] = time.perf_counter() - time_start
+            pn.state.log(f'Imported {self._name} in {dict_import_timings[self._name]:.2f} s')
+            self._module = module
+        return self._module
+
+    def __getattr__(self, attribute: str):
+        return getattr(self.load(), attribute)
+
+
+# brightway (imported on demand)
+bgt = lazy_module_class('bw_graph_tools')
+requests = lazy_module_class('requests')
+bi = lazy_module_class('bw2io')
+bd = lazy_module_class('bw2data')
+bc = lazy_module_class('bw2calc')
 
 # type hints
-from bw2data.backends.proxies import Activity
-from bw_graph_tools.graph_traversal import Node
-from bw_graph_tools.graph_traversal import Edge
+if TYPE_CHECKING:
+    from bw2data.backends.proxies import Activity
+    from bw_graph_tools.graph_traversal import Node
+    from bw_graph_tools.graph_traversal import Edge
 
 
 def brightway_wasm_database_storage_workaround() -> None:
@@ -42,10 +121,320 @@ def brightway_wasm_database_storage_workaround() -> None:
     os.environ["BRIGHTWAY_DIR"] = "/tmp/"
 
 
+def load_modules(list_modules: list) -> None:
+    """
+    Imports the modules behind the given `lazy_module_class` proxies.
+    """
+    for module in list_modules:
+        module.load()
+
+
+async def preload_modules() -> None:
+    """
+    Imports the Brightway packages needed for the first LCA calculation after the page has loaded (see `pn.state.onload`),
+    so that the template is rendered before the slow imports, and the imports are (mostly) done before the first click.
+    `bw2io` is not preloaded, since it is only needed if the USEEIO project is not yet installed.
+
+    Under `panel serve`, the modules are imported on the process-wide thread pool (see `calculation_executor`).
+    In Pyodide, where threads are not available, they are imported directly, after yielding once to the event loop.
+    """
+    list_modules: list = [bd, bc, bgt]
+    if sys.platform == 'emscripten':
+        await asyncio.sleep(0)
+        load_modules(list_modules)
+    else:
+        await asyncio.get_running_loop().run_in_executor(calculation_executor, load_modules, list_modules)
+    pn.state.log(
+        'Import timings: ' + ', '.join(f'{name} {seconds:.2f} s' for name, seconds in dict_import_timings.items())
+    )
+
+
+def get_shared_cache(key: tuple, function, *args):
+    """
+    Returns the value of `function(*args)` from the process-wide `pn.state.cache`.
+
+    Under `panel serve`, this script is executed once per session,
+    so that all module-level objects (widgets, `panel_lca_class_instance`) are session-scoped.
+    `pn.state.cache` is shared by all sessions of a process, so that
+    immutable heavy data (database handle, product list, method metadata, factorized matrices)
+    is only loaded once per process, no matter how many users are connected.
+
+    Cached values are returned without locking. Every key has a lock of its own,
+    so that a value is only computed once, while lookups and computations of other keys
+    (eg. of other sessions) do not wait for it.
+
+    Notes
+    -----
+    Values must be treated as read-only by the sessions, and must not be `None`.
+
+    - https://panel.holoviz.org/how_to/caching/manual.html
+
+    Parameters
+    ----------
+    key : tuple
+        Cache key, e.g. `('list_db_products', 'USEEIO-1.1')`.
+    function : callable
+        Function computing the value if the key is not yet cached.
+    *args
+        Arguments passed to `function`.
+    """
+    value = pn.state.cache.get(key)
+    if value is not None:
+        return value
+    dict_locks: dict = pn.state.cache.setdefault('shared_cache_locks', {})
+    with dict_locks.setdefault(key, threading.Lock()):
+        if key not in pn.state.cache:
+            pn.state.cache[key] = function(*args)
+        return pn.state.cache[key]
+
+
+"""
+Process-wide thread pool of the calculation stages (see `run_calculation_stage`) and of the module imports (see `preload_modules`).
+It is created when the script is executed, so that the event loop never has to look it up in the shared cache later on.
+"""
+calculation_executor: ThreadPoolExecutor = get_shared_cache(('calculation_executor',), ThreadPoolExecutor, 4)
+
+
+"""
+Largest technosphere matrix (number of products) for which the dense inverse is computed (see `dense_inverse_solver_class`).
+At 3000 products, the inverse takes about 70 MB of memory.
+"""
+int_dense_inverse_max_products: int = int(os.environ.get('BRIGHTWAY_DENSE_INVERSE_MAX_PRODUCTS', 3000))
+
+
+class dense_inverse_solver_class:
+    """
+    Linear system solver using the dense inverse of the technosphere matrix (Leontief inverse, total requirements matrix).
+    Has the interface of the factorized solver `bw2calc.LCA.solver`, so that it can replace it
+    and is then used by all calculations on the `bw2calc.LCA` object (`lci`, graph traversal, portfolio).
+
+    For small input-output databases like USEEIO (a few hundred products), the inverse is computed in a fraction of a second.
+    The supply vector of a single product is then a column lookup instead of a solve,
+    and the scores of any product for all methods are a column lookup in `total_intensity` (see `panel_lca_class.set_characterization_array`).
+
+    Notes
+    -----
+    See also:
+
+    - https://docs.brightway.dev/en/latest/content/theory/lca.html
+    """
+    def __init__(self, technosphere_matrix):
+        self.inverse: np.ndarray = np.linalg.inv(technosphere_matrix.toarray())
+
+
+    def __call__(self, demand: np.ndarray) -> np.ndarray:
+        if demand.ndim == 1:
+            array_nonzero: np.ndarray = np.flatnonzero(demand)
+            if len(array_nonzero) == 1:
+                return self.inverse[:, array_nonzero[0]] * demand[array_nonzero[0]]
+        return self.inverse @ demand
+
+
+def create_factorized_lca(demand: dict, method: tuple):
+    """
+    Returns a `bw2calc.LCA` object with loaded matrices and factorized technosphere matrix.
+    Used as process-wide shared base object (see `get_shared_cache`), of which every session uses a shallow copy.
+
+    If the technosphere matrix is small enough (see `int_dense_inverse_max_products`),
+    the factorized solver is replaced by its dense inverse (see `dense_inverse_solver_class`).
+    Else, or if the matrix cannot be inverted, the sparse solver is used.
+    """
+    lca = bc.LCA(
+        demand=demand,
+        method=method
+    )
+    lca.lci(factorize=True)
+    if lca.technosphere_matrix.shape[0] <= int_dense_inverse_max_products:
+        try:
+            lca.solver = dense_inverse_solver_class(lca.technosphere_matrix)
+            lca.lci_calculation()
+        except np.linalg.LinAlgError as error:
+            pn.state.log(f'Dense inverse of the technosphere matrix not available, using the sparse solver: {error}')
+    lca.lcia()
+    return lca
+
+
+def get_pyodide_file_url(path: str) -> str | None:
+    """
+    Returns the URL of a file deployed with the Pyodide application (eg. 'snapshots/USEEIO-1.1.tar.gz'),
+    relative to the location of its worker script. Returns `None` outside of Pyodide.
+    """
+    if sys.platform != 'emscripten':
+        return None
+    import js
+    return urllib.parse.urljoin(str(js.location.href), path)
+
+
+"""
+Pre-built snapshots of Brightway projects (`.tar` archives of the project directory, optionally gzip-compressed,
+including the SQLite database and the processed datapackages), see `dev/_README.md`.
+Every snapshot is accompanied by a `<snapshot>.sha256` file in the format of `sha256sum`.
+Entries can be local file paths (eg. for containers with a mounted volume) or URLs.
+
+The Pyodide application is deployed with a snapshot built by `dev/_build_project_snapshot.py`, which is used by default.
+Under `panel serve`, no snapshot is used by default. The environment variable overrides the default.
+"""
+dict_project_snapshots: dict = {
+    'USEEIO-1.1': os.environ.get('BRIGHTWAY_SNAPSHOT_USEEIO', get_pyodide_file_url('snapshots/USEEIO-1.1.tar.gz')),
+}
+
+
+def get_file_sha256(path: Path) -> str:
+    """
+    Returns the hexadecimal SHA-256 checksum of a file, read in chunks of 1 MiB.
+    """
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(2**20), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def get_project_snapshot(project_name: str) -> Path | None:
+    """
+    Returns the path of the verified snapshot of a Brightway project,
+    or `None` if there is no snapshot or if it fails the checksum verification.
+
+    Remote snapshots are downloaded to the `bw2io` cache directory,
+    in the same way as `bw2io.install_project` does for its archives.
+    Invalid files (eg. from interrupted downloads) are deleted.
+
+    Parameters
+    ----------
+    project_name : str
+        Name of the Brightway project, eg. 'USEEIO-1.1'.
+
+    Returns
+    -------
+    Path | None
+        Path of the snapshot file.
+    """
+    location: str | None = dict_project_snapshots.get(project_name)
+    if location is None:
+        return None
+    try:
+        if Path(location).is_file():
+            path_snapshot = Path(location)
+            sha256_expected: str = Path(location + '.sha256').read_text().split()[0]
+        else:
+            filename: str = location.rsplit('/', 1)[-1]
+            path_snapshot = Path(bi.remote.cache_dir) / filename
+            if not (Path(bi.remote.cache_dir) / (filename + '.sha256')).is_file():
+                bi.download_utils.download_with_progressbar(url=location + '.sha256', filename=filename + '.sha256', dirpath=bi.remote.cache_dir)
+            sha256_expected: str = (Path(bi.remote.cache_dir) / (filename + '.sha256')).read_text().split()[0]
+            if not path_snapshot.is_file():
+                bi.download_utils.download_with_progressbar(url=location, filename=filename, dirpath=bi.remote.cache_dir)
+    except (requests.RequestException, OSError, ValueError) as error: # `ValueError` if the server does not return the file
+        pn.state.log(f'Snapshot of project {project_name} not available: {error}')
+        return None
+    if get_file_sha256(path_snapshot) != sha256_expected.lower():
+        if path_snapshot.parent == Path(bi.remote.cache_dir):
+            path_snapshot.unlink(missing_ok=True)
+            (path_snapshot.parent / (path_snapshot.name + '.sha256')).unlink(missing_ok=True)
+        return None
+    return path_snapshot
+
+
+def restore_project_snapshot(project_name: str) -> bool:
+    """
+    Restores a Brightway project from its pre-built snapshot (see `get_project_snapshot`).
+
+    The archive is extracted into a temporary directory next to the project directory which is then moved (not copied) into place,
+    so that the restore is only limited by I/O (and decompression, for compressed archives).
+    The project is only activated once all files are in place,
+    so that its SQLite database is never overwritten under an open connection.
+
+    Parameters
+    ----------
+    project_name : str
+        Name of the Brightway project, eg. 'USEEIO-1.1'.
+
+    Returns
+    -------
+    bool
+        `True` if the project was restored, `False` if no valid snapshot is available.
+    """
+    path_snapshot: Path | None = get_project_snapshot(project_name)
+    if path_snapshot is None:
+        return False
+    path_base = Path(bd.projects._base_data_dir)
+    path_project: Path = path_base / bd.utils.safe_filename(project_name, full=False)
+    try:
+        with tempfile.TemporaryDirectory(dir=path_base) as directory_temporary:
+            path_extracted = Path(directory_temporary) / 'project'
+            with tarfile.open(path_snapshot, 'r:*') as tar:
+                list_members: list = []
+                for member in tar.getmembers():
+                    # strip the top-level directory of the archive, eg. 'USEEIO-11.4672829d/lci/databases.db' -> 'lci/databases.db'
+                    member.name = member.name.partition('/')[2]
+                    if member.name != '':
+                        list_members.append(member)
+                tar.extractall(path=path_extracted, members=list_members, filter='data')
+            if path_project.exists():
+                shutil.rmtree(path_project) # left over from an interrupted installation, the project is not registered
+            path_extracted.rename(path_project)
+    except (tarfile.TarError, OSError) as error:
+        pn.state.log(f'Snapshot of project {project_name} could not be restored: {error}')
+        return False
+    current_project: str = bd.projects.current
+    bd.projects.set_current(project_name, update=False)
+    bd.projects.set_current(current_project)
+    return True
+
+
+def solve_technosphere(lca, demand: np.ndarray) -> np.ndarray:
+    """
+    Solves the technosphere system `A x = f` of a `bw2calc.LCA` object
+    for one demand vector or for a matrix of demand vectors (one per column),
+    re-using the factorized technosphere matrix (see `create_factorized_lca`).
+
+    A matrix of demand vectors is solved in a single call (multi-column right-hand side),
+    unless the solver only accepts vectors (eg. UMFPACK), in which case the columns are solved one after the other.
+
+    Returns
+    -------
+    np.ndarray
+        Supply vector or matrix, of the same shape as `demand`.
+    """
+    if demand.ndim == 2:
+        try:
+            supply = np.asarray(lca.solve_linear_system(demand))
+            if supply.shape == demand.shape:
+                return supply
+        except ValueError:
+            pass
+        return np.column_stack([lca.solve_linear_system(demand[:, column]) for column in range(demand.shape[1])])
+    return lca.solve_linear_system(demand)
+
+
+def read_portfolio_csv(file_content: bytes) -> pd.DataFrame:
+    """
+    Reads a portfolio (eg. a spend ledger) from a CSV file with the columns 'product' and 'amount' (case-insensitive).
+    Products can be given by name, by label of the product search (eg. 'Electricity (France)') or by node id.
+
+    | product         | amount |
+    |-----------------|--------|
+    | Grains; at farm | 1200   |
+    | Electricity     | 350.5  |
+
+    Raises
+    ------
+    ValueError
+        If the file does not have the required columns.
+    """
+    df = pd.read_csv(io.BytesIO(file_content))
+    df.columns = [str(column).strip().lower() for column in df.columns]
+    if not {'product', 'amount'} <= set(df.columns):
+        raise ValueError("The portfolio file must have the columns 'product' and 'amount'.")
+    return df[['product', 'amount']]
+
+
 def check_for_useeio_brightway_project(event):
     """
     Checks if the USEEIO-1.1 Brightway project is installed.
-    If not, installs it. Shows Panel notifications for the user.
+    If not, restores it from the pre-built snapshot (see `restore_project_snapshot`),
+    or installs it with `bw2io.install_project` if no valid snapshot is available.
+    Shows Panel notifications for the user.
 
     Returns
     -------
@@ -54,7 +443,8 @@ def check_for_useeio_brightway_project(event):
     """
     if 'USEEIO-1.1' not in bd.projects:
         notification_load = pn.state.notifications.info('Loading USEEIO database...')
-        bi.install_project(project_key="USEEIO-1.1", overwrite_existing=True)
+        if not restore_project_snapshot('USEEIO-1.1'):
+            bi.install_project(project_key="USEEIO-1.1", overwrite_existing=True)
         notification_load.destroy()
         pn.state.notifications.success('USEEIO database loaded!', duration=7000)
     else:
@@ -63,114 +453,506 @@ def check_for_useeio_brightway_project(event):
     bd.projects.set_current(name='USEEIO-1.1')
 
 
+def get_node_metadata(ids: list) -> pd.DataFrame:
+    """
+    Returns a dataframe with human-readable metadata of the nodes with the given ids.
+
+    All nodes are fetched from the database in a single query,
+    instead of building one `bw2data.backends.proxies.Activity` object per node.
+
+    For example:
+
+    | id | name                          | unit | location      | type    |
+    |----|-------------------------------|------|---------------|---------|
+    | 53 | Electricity; at consumer      | USD  | United States | process |
+    | 87 | Automobiles; at manufacturer  | USD  | United States | process |
+
+    Parameters
+    ----------
+    ids : list
+        A list of integer node ids (=`activity_datapackage_id` of the graph traversal nodes).
+        Duplicate ids are only fetched once.
+
+    Returns
+    -------
+    pd.DataFrame
+        A dataframe indexed by node id, with columns 'name', 'unit', 'location' and 'type'.
+    """
+    ActivityDataset = bd.backends.ActivityDataset
+    query = (
+        ActivityDataset
+        .select(
+            ActivityDataset.id,
+            ActivityDataset.name,
+            ActivityDataset.location,
+            ActivityDataset.type,
+            ActivityDataset.data,
+        )
+        .where(ActivityDataset.id.in_(list(set(ids))))
+        .tuples()
+    )
+    list_ids, list_names, list_units, list_locations, list_types = [], [], [], [], []
+    for node_id, name, location, node_type, data in query:
+        list_ids.append(node_id)
+        list_names.append(name)
+        list_units.append(data.get('unit'))
+        list_locations.append(location)
+        list_types.append(node_type)
+    return pd.DataFrame(
+        {
+            'name': list_names,
+            'unit': list_units,
+            'location': list_locations,
+            'type': list_types,
+        },
+        index=pd.Index(list_ids, name='id'),
+    )
+
+
+"""
+Ids of the activities whose direct emissions are scope 2 emissions
+(generation of purchased electricity, steam, heat and cooling), by database name.
+Databases without an entry fall back to a search of the activity names (see `get_scope_2_activity_ids`).
+"""
+dict_scope_2_activity_ids: dict = {
+    'USEEIO-1.1': [53], # 'Electricity; at consumer'
+}
+regex_scope_2_activity_names = re.compile(r'\b(electricity|steam|heat|heating|cooling)\b', flags=re.IGNORECASE)
+
+
+def get_scope_2_activity_ids(db_name: str) -> np.ndarray:
+    """
+    Returns the sorted array of ids of the scope 2 activities of a database.
+
+    The ids are taken from `dict_scope_2_activity_ids` if the database has an entry.
+    Otherwise, all process nodes of the database are fetched with a single query,
+    and those whose name matches `regex_scope_2_activity_names` are returned
+    (eg. 'Electricity, high voltage' or 'Heat, district or industrial', but not 'Wheat grains').
+
+    Parameters
+    ----------
+    db_name : str
+        Name of the database.
+
+    Returns
+    -------
+    np.ndarray
+        Sorted integer array of activity ids, for use with `np.isin`.
+    """
+    if db_name in dict_scope_2_activity_ids:
+        return np.unique(np.asarray(dict_scope_2_activity_ids[db_name], dtype=int))
+    ActivityDataset = bd.backends.ActivityDataset
+    query = (
+        ActivityDataset
+        .select(ActivityDataset.id, ActivityDataset.name)
+        .where(
+            (ActivityDataset.database == db_name) &
+            (ActivityDataset.type.contains('process'))
+        )
+        .tuples()
+    )
+    return np.unique(np.array(
+        [node_id for node_id, name in query if regex_scope_2_activity_names.search(name)],
+        dtype=int
+    ))
+
+
+def build_product_catalogue(db_name: str) -> dict:
+    """
+    Returns the product catalogue of a database, fetched with a single database query.
+
+    The catalogue contains the ids, names and locations of all product nodes,
+    as well as the order of the products sorted by lowercase name (for prefix search).
+    It also stores the modification timestamp of the database, which is used to detect outdated catalogues.
+
+    For example:
+
+    catalogue = {
+        'modified': '2024-11-07T10:46:34.178471',
+        'ids': [1, 2, ...],
+        'names': ['Oilseeds; at farm', 'Grains; at farm', ...],
+        'locations': ['United States', 'United States', ...],
+        'sorted': [1, 0, ...],
+    }
+
+    Parameters
+    ----------
+    db_name : str
+        Name of the database.
+
+    Returns
+    -------
+    dict
+        Product catalogue.
+    """
+    ActivityDataset = bd.backends.ActivityDataset
+    query = (
+        ActivityDataset
+        .select(ActivityDataset.id, ActivityDataset.name, ActivityDataset.location)
+        .where(
+            (ActivityDataset.database == db_name) &
+            (ActivityDataset.type.contains('product'))
+        )
+        .order_by(ActivityDataset.id)
+        .tuples()
+    )
+    list_ids, list_names, list_locations = [], [], []
+    for node_id, name, location in query:
+        list_ids.append(node_id)
+        list_names.append(name)
+        list_locations.append(location)
+    return {
+        'modified': bd.databases[db_name].get('modified'),
+        'ids': list_ids,
+        'names': list_names,
+        'locations': list_locations,
+        'sorted': sorted(range(len(list_names)), key=lambda index: list_names[index].lower()),
+    }
+
+
+def create_product_catalogue_labels(catalogue: dict) -> list:
+    """
+    Returns unique labels of the products in the catalogue, for use in the autocomplete widget.
+
+    Names which are unique in the catalogue are used as they are.
+    Otherwise, the location is appended, and if this is still ambiguous, the node id:
+
+    | id | name                | location      | label                               |
+    |----|---------------------|---------------|-------------------------------------|
+    | 1  | Grains; at farm     | United States | Grains; at farm                     |
+    | 2  | Electricity         | Switzerland   | Electricity (Switzerland)           |
+    | 3  | Electricity         | France        | Electricity (France)                |
+    | 4  | Electricity         | France        | Electricity (France) [4]            |
+    | 5  | Electricity         | France        | Electricity (France) [5]            |
+
+    Parameters
+    ----------
+    catalogue : dict
+        Product catalogue, as returned by `build_product_catalogue`.
+
+    Returns
+    -------
+    list
+        List of unique labels, in the order of `catalogue['ids']`.
+    """
+    series_names = pd.Series(catalogue['names'])
+    series_labels = series_names.where(
+        ~series_names.duplicated(keep=False),
+        series_names + ' (' + pd.Series(catalogue['locations']).fillna('').astype(str) + ')'
+    )
+    series_labels = series_labels.where(
+        ~series_labels.duplicated(keep=False),
+        series_labels + ' [' + pd.Series(catalogue['ids']).astype(str) + ']'
+    )
+    return series_labels.tolist()
+
+
+def load_product_catalogue(db_name: str) -> dict:
+    """
+    Returns the product catalogue of a database (see `build_product_catalogue`),
+    with an in-memory search index (see `search_product_catalogue`).
+
+    The catalogue is persisted as JSON file in the project directory,
+    so that it is only built once per project. It is rebuilt if the database has been modified since.
+
+    Parameters
+    ----------
+    db_name : str
+        Name of the database.
+
+    Returns
+    -------
+    dict
+        Product catalogue, with additional keys 'labels', 'dict_labels_to_ids', 'dict_ids_to_names',
+        'search_string', 'search_offsets' and 'sorted_names'.
+    """
+    path_catalogue = bd.projects.dir / f'product_catalogue_{db_name}.json'
+    catalogue = None
+    if path_catalogue.is_file():
+        with open(path_catalogue, mode='r', encoding='utf-8') as file:
+            catalogue = json.load(file)
+        if catalogue.get('modified') != bd.databases[db_name].get('modified'):
+            catalogue = None
+    if catalogue is None:
+        catalogue = build_product_catalogue(db_name)
+        with open(path_catalogue, mode='w', encoding='utf-8') as file:
+            json.dump(catalogue, file)
+
+    catalogue['labels'] = create_product_catalogue_labels(catalogue)
+    catalogue['dict_labels_to_ids'] = dict(zip(catalogue['labels'], catalogue['ids']))
+    catalogue['dict_ids_to_names'] = dict(zip(catalogue['ids'], catalogue['names']))
+
+    list_names_lower: list = [name.lower() for name in catalogue['names']]
+    catalogue['sorted_names'] = [list_names_lower[index] for index in catalogue['sorted']]
+    catalogue['search_string'] = '\n'.join(list_names_lower)
+    catalogue['search_offsets'] = np.cumsum([0] + [len(name) + 1 for name in list_names_lower[:-1]]).tolist()
+    return catalogue
+
+
+def search_product_catalogue(catalogue: dict, query: str, max_results: int = 100) -> list:
+    """
+    Returns the indices of the products in the catalogue whose name contains the query (case-insensitive).
+    Products whose name starts with the query are returned first.
+
+    Prefix matches are found by binary search in the sorted names.
+    Substring matches are found by searching the names joined into a single string
+    and mapping each hit back to its product by binary search in the name offsets.
+
+    Parameters
+    ----------
+    catalogue : dict
+        Product catalogue, as returned by `load_product_catalogue`.
+    query : str
+        Search string.
+    max_results : int
+        Maximum number of results.
+
+    Returns
+    -------
+    list
+        List of indices into `catalogue['ids']` and `catalogue['names']`.
+    """
+    query = query.lower()
+    if query == '' or '\n' in query:
+        return []
+
+    list_results: list = []
+    position: int = bisect.bisect_left(catalogue['sorted_names'], query)
+    while (
+        len(list_results) < max_results and
+        position < len(catalogue['sorted_names']) and
+        catalogue['sorted_names'][position].startswith(query)
+    ):
+        list_results.append(catalogue['sorted'][position])
+        position += 1
+
+    set_results: set = set(list_results)
+    list_offsets: list = catalogue['search_offsets'] + [len(catalogue['search_string']) + 1]
+    position = catalogue['search_string'].find(query)
+    while len(list_results) < max_results and position != -1:
+        index: int = bisect.bisect_right(list_offsets, position) - 1
+        if index not in set_results:
+            set_results.add(index)
+            list_results.append(index)
+        position = catalogue['search_string'].find(query, list_offsets[index + 1])
+    return list_results
+
+
+def create_graph_traversal_arrays(nodes: dict, edges: list) -> dict:
+    """
+    Returns the result of a graph traversal in columnar form, as a dictionary of NumPy arrays.
+
+    Every node of the graph traversal (except the functional unit node) is the producer of exactly one edge.
+    The arrays are therefore built in a single pass over the edges, in the order in which the producer nodes were created
+    (which is also the order of their `unique_id`). The `Node` and `Edge` objects are not copied into intermediate lists of dictionaries.
+
+    | unique_id | activity_id | activity_index | supply | direct | cumulative | depth | parent |
+    |-----------|-------------|----------------|--------|--------|------------|-------|--------|
+    | 0         | 3           | 2              | 100    | 1.2    | 10.0       | 1     | -1     |
+    | 1         | 7           | 6              | 20     | 0.4    | 5.1        | 2     | 0      |
+    | ...       | ...         | ...            | ...    | ...    | ...        | ...   | ...    |
+
+    Parameters
+    ----------
+    nodes : dict
+        Dictionary of `Node` objects, indexed by `unique_id`.
+    edges : list
+        List of `Edge` objects, starting with the edge from the functional unit node to the root node.
+
+    Returns
+    -------
+    dict
+        Dictionary of NumPy arrays with keys
+        'unique_id', 'activity_id', 'activity_index', 'product_index', 'supply', 'direct', 'direct_outside_flows', 'cumulative', 'depth' and 'parent'.
+        'activity_index' and 'product_index' are the column and row of the node in the technosphere matrix.
+        'direct' is the score of all direct emissions (characterized biosphere flows) of the supply amount of the node,
+        'direct_outside_flows' the part of it which is not broken out into separate biosphere flows by the graph traversal.
+        'parent' is the `unique_id` of the consumer, or -1 for the root node.
+    """
+    count: int = len(edges)
+    list_nodes: list = [nodes[edge.producer_unique_id] for edge in edges]
+    return {
+        'unique_id': np.fromiter((node.unique_id for node in list_nodes), dtype=int, count=count),
+        'activity_id': np.fromiter((node.activity_datapackage_id for node in list_nodes), dtype=int, count=count),
+        'activity_index': np.fromiter((node.activity_index for node in list_nodes), dtype=int, count=count),
+        'product_index': np.fromiter((node.reference_product_index for node in list_nodes), dtype=int, count=count),
+        'supply': np.fromiter((node.supply_amount for node in list_nodes), dtype=float, count=count),
+        'direct': np.fromiter((node.direct_emissions_score for node in list_nodes), dtype=float, count=count),
+        'direct_outside_flows': np.fromiter((node.direct_emissions_score_outside_specific_flows for node in list_nodes), dtype=float, count=count),
+        'cumulative': np.fromiter((node.cumulative_score for node in list_nodes), dtype=float, count=count),
+        'depth': np.fromiter((node.depth for node in list_nodes), dtype=int, count=count),
+        'parent': np.fromiter((edge.consumer_unique_id for edge in edges), dtype=int, count=count),
+    }
+
+
 def nodes_dict_to_dataframe(
-        nodes: dict,
-        uid_electricity: int = 53 # hardcoded for USEEIO
+        traversal: dict,
+        scope_2_activity_ids: np.ndarray,
     ) -> pd.DataFrame:
     """
     Returns a dataframe with human-readable descriptions and emissions values of the nodes in the graph traversal.
 
+    The node names are fetched with a single query (see `get_node_metadata`).
+    The arrays of the graph traversal are wrapped by the dataframe without copying.
+
+    Scopes are assigned with a vectorized lookup: the root node is scope 1,
+    nodes of scope 2 activities (see `get_scope_2_activity_ids`) are scope 2, all other nodes are scope 3.
+
     Parameters
     ----------
-    nodes : dict
-        A dictionary of nodes in the graph traversal.
-        Can be created by selecting the 'nodes' key from the dictionary
-        returned by the function `bw_graph_tools.NewNodeEachVisitGraphTraversal.calculate()`.
+    traversal : dict
+        Dictionary of NumPy arrays of the graph traversal (see `create_graph_traversal_arrays`).
+    scope_2_activity_ids : np.ndarray
+        Sorted array of the ids of the scope 2 activities of the database.
 
     Returns
     -------
     pd.DataFrame
         A dataframe with human-readable descriptions and emissions values of the nodes in the graph traversal.
     """
-    list_of_row_dicts = []
-    for current_node in nodes.values():
-
-        scope: int = 3
-        if current_node.unique_id == -1:
-            continue
-        elif current_node.unique_id == 0:
-            scope = 1
-        elif current_node.activity_datapackage_id == uid_electricity:
-            scope = 2
-        else:
-            pass
-        list_of_row_dicts.append(
-            {
-                'UID': current_node.unique_id,
-                'Scope': scope,
-                'Name': bd.get_node(id=current_node.activity_datapackage_id)['name'],
-                'SupplyAmount': current_node.supply_amount,
-                'BurdenIntensity': current_node.direct_emissions_score/current_node.supply_amount,
-                # 'Burden(Cumulative)': current_node.cumulative_score,
-                'Burden(Direct)': current_node.direct_emissions_score + current_node.direct_emissions_score_outside_specific_flows,
-                'Depth': current_node.depth,
-                'activity_datapackage_id': current_node.activity_datapackage_id,
-            }
-        )
-    return pd.DataFrame(list_of_row_dicts)
+    array_scope = np.full(len(traversal['unique_id']), 3)
+    array_scope[np.isin(traversal['activity_id'], scope_2_activity_ids)] = 2
+    array_scope[traversal['unique_id'] == 0] = 1
+
+    df_metadata: pd.DataFrame = get_node_metadata(traversal['activity_id'].tolist())
+
+    return pd.DataFrame(
+        {
+            'UID': traversal['unique_id'],
+            'Scope': array_scope,
+            'Name': df_metadata['name'].reindex(traversal['activity_id']).to_numpy(),
+            'SupplyAmount': traversal['supply'],
+            'BurdenIntensity': traversal['direct'] / traversal['supply'],
+            # 'Burden(Cumulative)': traversal['cumulative'],
+            'Burden(Direct)': traversal['direct'] + traversal['direct_outside_flows'],
+            'Depth': traversal['depth'],
+            'activity_datapackage_id': traversal['activity_id'],
+        },
+        copy=False
+    )
 
 
-def edges_dict_to_dataframe(edges: list) -> pd.DataFrame:
+def edges_dict_to_dataframe(traversal: dict) -> pd.DataFrame:
     """
-    To be added...
+    Returns a dataframe of the edges of the graph traversal, without the edge to the root node.
+    The columns are views of the arrays of the graph traversal (see `create_graph_traversal_arrays`).
+
+    | consumer_unique_id | producer_unique_id |
+    |--------------------|--------------------|
+    | 0                  | 1                  |
+    | 0                  | 2                  |
+    | 2                  | 3                  |
     """
-    if len(edges) < 2:
+    if len(traversal['unique_id']) < 2:
         return pd.DataFrame()
     else:
-        list_of_row_dicts = []
-        for current_edge in edges:
-            list_of_row_dicts.append(
-                {
-                    'consumer_unique_id': current_edge.consumer_unique_id,
-                    'producer_unique_id': current_edge.producer_unique_id
-                }
-            )
-        return pd.DataFrame(list_of_row_dicts).drop(0)
+        return pd.DataFrame(
+            {
+                'consumer_unique_id': traversal['parent'][1:],
+                'producer_unique_id': traversal['unique_id'][1:],
+            },
+            index=pd.RangeIndex(1, len(traversal['unique_id'])),
+            copy=False
+        )
 
 
-def trace_branch(df: pd.DataFrame, start_node: int) -> list:
+def build_parent_array(df: pd.DataFrame) -> np.ndarray:
     """
-    Given a dataframe of graph edges and a "starting node" (producer_unique_id), returns the branch of nodes that lead to the starting node.
+    Given a dataframe of graph edges, returns an array of "parent pointers" indexed by `unique_id`.
 
     For example:
 
     | consumer_unique_id | producer_unique_id |
     |--------------------|--------------------|
-    | 0                  | 1                  | # 1 is terminal producer node
+    | 0                  | 1                  |
     | 0                  | 2                  |
     | 0                  | 3                  |
-    | 2                  | 4                  | # 4 is terminal producer node
+    | 2                  | 4                  |
     | 3                  | 5                  |
-    | 5                  | 6                  | # 6 is terminal producer node
+    | 5                  | 6                  |
 
-    For start_node = 6, the function returns [0, 3, 5, 6]
+    returns the array `[-1, 0, 0, 0, 2, 3, 5]`, where `-1` marks a node without consumer (=the root node).
 
     Parameters
     ----------
     df : pd.DataFrame
         Dataframe of graph edges. Must contain integer-type columns 'consumer_unique_id' and 'producer_unique_id'.
-    start_node : int
-        The integer indicating the producer_unique_id starting node to trace back from.
 
     Returns
     -------
-    list
-        A list of integers indicating the branch of nodes that lead to the starting node.
+    np.ndarray
+        Integer array `parent`, where `parent[unique_id]` is the `unique_id` of the consumer of that node.
+    """
+    array_consumer = df['consumer_unique_id'].to_numpy(dtype=int)
+    array_producer = df['producer_unique_id'].to_numpy(dtype=int)
+    parent = np.full(max(array_consumer.max(), array_producer.max()) + 1, -1, dtype=int)
+    parent[array_producer] = array_consumer
+    return parent
+
+
+def compute_branches(parent: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
+    Given an array of parent pointers (see `build_parent_array`),
+    returns the branches (=paths from the root node) of all nodes, stored in a single flat array.
 
-    branch: list = [start_node]
+    Branches are computed level-by-level in a single topological pass.
+    The branch of a node is the branch of its parent with the node appended,
+    so that shared prefixes are copied from the parent instead of re-traced.
 
-    while True:
-        previous_node: int = df[df['producer_unique_id'] == start_node]['consumer_unique_id']
-        if previous_node.empty:
-            break
-        start_node: int = previous_node.values[0]
-        branch.insert(0, start_node)
+    For the parent array `[-1, 0, 0, 0, 2, 3, 5]`, the function returns:
 
-    return branch
+    | unique_id | offset | length | flat[offset:offset+length] |
+    |-----------|--------|--------|----------------------------|
+    | 0         | 0      | 1      | [0]                        |
+    | 1         | 1      | 2      | [0, 1]                     |
+    | 2         | 3      | 2      | [0, 2]                     |
+    | 3         | 5      | 2      | [0, 3]                     |
+    | 4         | 7      | 3      | [0, 2, 4]                  |
+    | 5         | 10     | 3      | [0, 3, 5]                  |
+    | 6         | 13     | 4      | [0, 3, 5, 6]               |
 
+    Parameters
+    ----------
+    parent : np.ndarray
+        Integer array of parent pointers, with `-1` for root nodes.
 
-def add_branch_information_to_edges_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        The flat array of all branches, and the `offset` and `length` arrays indexed by `unique_id`.
+    """
+    count: int = len(parent)
+    is_root = parent < 0
+
+    # branch length by pointer jumping: O(N log(depth)), fully vectorized
+    distance = (~is_root).astype(int)
+    jump = parent.copy()
+    while (jump >= 0).any():
+        has_jump = jump >= 0
+        distance_next = distance.copy()
+        distance_next[has_jump] += distance[jump[has_jump]]
+        jump[has_jump] = jump[jump[has_jump]]
+        distance = distance_next
+    length = distance + 1
+
+    offset = np.zeros(count, dtype=int)
+    np.cumsum(length[:-1], out=offset[1:])
+    flat = np.empty(length.sum(), dtype=int)
+
+    for level in range(1, length.max() + 1):
+        nodes = np.flatnonzero(length == level)
+        if level > 1:
+            steps = np.arange(level - 1)
+            flat[offset[nodes][:, None] + steps] = flat[offset[parent[nodes]][:, None] + steps]
+        flat[offset[nodes] + level - 1] = nodes
+
+    return flat, offset, length
+
+
+def add_branch_information_to_edges_dataframe(
+        df: pd.DataFrame,
+        store_as_offsets: bool = False,
+    ) -> pd.DataFrame:
     """
     Adds 'branch' information to terminal nodes in a dataframe of graph edges.
 
@@ -199,264 +981,601 @@ def add_branch_information_to_edges_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     df_edges : pd.DataFrame
         A dataframe of graph edges.
         Must contain integer-type columns 'consumer_unique_id' and 'producer_unique_id'.
+    store_as_offsets : bool
+        If True, the branches are not stored as one Python list per row.
+        Instead, the dataframe has the integer columns 'BranchOffset' and 'BranchLength'
+        pointing into one flat array of node ids, stored in `df.attrs['BranchArray']`.
 
     Returns
     -------
     pd.DataFrame
         A dataframe of graph nodes with a column 'branch' that contains the branch of nodes that lead to the terminal producer node.
     """
-    # initialize empty list to store branches
-    branches: list = []
-
-    for _, row in df.iterrows():
-        branch: list = trace_branch(df, int(row['producer_unique_id']))
-        branches.append({
-            'producer_unique_id': int(row['producer_unique_id']),
-            'Branch': branch
+    parent: np.ndarray = build_parent_array(df)
+    flat, offset, length = compute_branches(parent)
+    array_producer = df['producer_unique_id'].to_numpy(dtype=int)
+
+    if store_as_offsets:
+        df_branches = pd.DataFrame({
+            'producer_unique_id': array_producer,
+            'BranchOffset': offset[array_producer],
+            'BranchLength': length[array_producer],
         })
-
-    return pd.DataFrame(branches)
+        df_branches.attrs['BranchArray'] = flat
+        return df_branches
+
+    return pd.DataFrame({
+        'producer_unique_id': array_producer,
+        'Branch': [
+            flat[start:stop].tolist()
+            for start, stop in zip(offset[array_producer], offset[array_producer] + length[array_producer])
+        ]
+    })
 
 
-def create_user_input_columns(
-        df_original: pd.DataFrame,
-        df_user_input: pd.DataFrame,
-    ) -> pd.DataFrame:
+def build_traversal_tree(df: pd.DataFrame, traversal: dict) -> dict:
     """
-    Creates a new column in the 'original' DataFrame where only the
-    user-supplied values are kept. The other values are replaced by NaN.
-
-    For instance, given an "original" DataFrame of the kind:
-
-    | UID | SupplyAmount | BurdenIntensity |
-    |-----|--------------|-----------------|
-    | 0   | 1            | 0.1             |
-    | 1   | 0.5          | 0.5             |
-    | 2   | 0.2          | 0.3             |
-
-    and a "user input" DataFrame of the kind:
-
-    | UID | SupplyAmount | BurdenIntensity |
-    |-----|--------------|-----------------|
-    | 0   | 1            | 0.1             |
-    | 1   | 0            | 0.5             |
-    | 2   | 0.2          | 2.1             |
-
-    the function returns a DataFrame of the kind:
-
-    | UID | SupplyAmount | SupplyAmount_USER | BurdenIntensity | BurdenIntensity_USER |
-    |-----|--------------|-------------------|-----------------|----------------------|
-    | 0   | 1            | NaN               | 0.1             | NaN                  |
-    | 1   | 0.5          | 0                 | 0.5             | NaN                  |
-    | 2   | 0.2          | NaN               | 0.3             | 2.1                  |
+    Returns the tree structure of the tabulator dataframe, used to propagate user edits along the branches
+    (see `update_traversal_based_on_coefficient_changes`).
 
     Parameters
     ----------
-    df_original : pd.DataFrame
-        Original DataFrame.
+    df : pd.DataFrame
+        Tabulator dataframe of the graph traversal, with the rows in the order of the graph traversal arrays.
+    traversal : dict
+        Dictionary of NumPy arrays of the graph traversal (see `create_graph_traversal_arrays`).
 
-    df_user_input : pd.DataFrame
-        User input DataFrame.
+    Returns
+    -------
+    dict
+        Dictionary of NumPy arrays indexed by `unique_id`:
+        'parent' (see `build_parent_array`), 'row' (position of the node in the dataframe),
+        'activity_index' and 'product_index' (column and row of the node in the technosphere matrix), -1 if absent.
     """
-    
-    df_merged = pd.merge(
-        df_original,
-        df_user_input[['UID', 'SupplyAmount', 'BurdenIntensity']],
-        on='UID',
-        how='left',
-        suffixes=('', '_USER')
-    )
-
-    for column_name in ['SupplyAmount', 'BurdenIntensity']:
-        df_merged[f'{column_name}_USER'] = np.where(
-            df_merged[f'{column_name}_USER'] != df_merged[f'{column_name}'],
-            df_merged[f'{column_name}_USER'],
-            np.nan
-        )
-
-    return df_merged
-
-
-def update_burden_intensity_based_on_user_data(df: pd.DataFrame) -> pd.DataFrame:
+    array_uid = df['UID'].to_numpy(dtype=int)
+    parent = np.full(array_uid.max() + 1, -1, dtype=int)
+    array_consumer = df['Branch'].map(lambda branch: branch[-2] if isinstance(branch, list) else -1)
+    parent[array_uid] = array_consumer.to_numpy(dtype=int)
+    row = np.full(len(parent), -1, dtype=int)
+    row[array_uid] = np.arange(len(array_uid))
+    activity_index = np.full(len(parent), -1, dtype=int)
+    activity_index[array_uid] = traversal['activity_index']
+    product_index = np.full(len(parent), -1, dtype=int)
+    product_index[array_uid] = traversal['product_index']
+    return {'parent': parent, 'row': row, 'activity_index': activity_index, 'product_index': product_index}
+
+
+def get_coefficient_changes_from_user_edits(
+        df: pd.DataFrame,
+        tree: dict,
+        dict_edits: dict,
+        lca,
+        dict_changes: dict | None = None,
+    ) -> dict:
     """
-    Updates the burden intensity when user data is provided.
-
-    For instance, given a DataFrame of the kind:
-
-    | UID | BurdenIntensity | BurdenIntensity_USER |
-    |-----|-----------------|----------------------|
-    | 0   | 0.1             | NaN                  |
-    | 1   | 0.5             | 0.25                 |
-    | 2   | 0.3             | NaN                  |
+    Translates one round of user edits of the tabulator (see `panel_lca_class.update_data_based_on_user_input`)
+    into changes of the coefficients of the LCA model, on top of the changes of the previous rounds:
+
+    - The supply amount of a node is the amount of its activity used by the activity of its parent node.
+      An edit therefore scales the technosphere coefficient (product of the node, activity of the parent node)
+      by the ratio of the user-supplied and the current supply amount.
+      The coefficient is changed wherever the parent activity uses the product,
+      including on all other branches of the graph traversal and below the cutoff.
+    - An edit of the supply amount of the root node scales the demand.
+    - The burden intensity of a node is the characterized direct emissions per unit of its activity.
+      An edit sets it for all nodes of the same activity.
+
+    Supply amount edits are translated in order of depth, and the current supply amount of every edited node
+    includes the changes of the edits above it (and of its own, shared edge) in the same round,
+    so that every edited node has the user-supplied supply amount.
+    If several nodes share the same technosphere coefficient, the deepest edit wins.
+
+    For instance, given the edits:
+
+    ```
+    dict_edits = {
+        0: {'SupplyAmount': 200},
+        4: {'SupplyAmount': 0.18, 'BurdenIntensity': 2.1},
+    }
+    ```
 
-    the function returns a DataFrame of the kind:
+    the function returns a dictionary of the kind:
 
-    | UID | BurdenIntensity |
-    |-----|-----------------|
-    | 0   | 0.1             |
-    | 1   | 0.25            |
-    | 2   | 0.3             |
+    ```
+    dict_changes = {
+        'demand_ratio': 2.0,
+        'technosphere': {(12, 3): -0.036}, # (product index, activity index): new coefficient
+        'intensity': {15: 2.1}, # activity index: new burden intensity
+    }
+    ```
 
     Parameters
     ----------
     df : pd.DataFrame
-        Input dataframe.
+        Tabulator dataframe of the graph traversal, with the changes of the previous rounds.
+    tree : dict
+        Tree structure of the dataframe (see `build_traversal_tree`).
+    dict_edits : dict
+        User-supplied values of this round, by `unique_id` and column.
+    lca : bw2calc.LCA
+        LCA object of the graph traversal.
+    dict_changes : dict | None
+        Coefficient changes of the previous rounds, not modified. `None` if there are none.
 
     Returns
     -------
-    pd.DataFrame
-        Output dataframe.
+    dict
+        Dictionary with keys 'demand_ratio', 'technosphere' and 'intensity', with the changes of all rounds.
+
+    Raises
+    ------
+    ValueError
+        If the supply amount of a node with a supply amount of zero is edited,
+        since the change of its coefficient cannot be derived from a ratio.
     """
+    if dict_changes is None:
+        dict_changes = {'demand_ratio': 1.0, 'technosphere': {}, 'intensity': {}}
+    array_supply = df['SupplyAmount'].to_numpy(dtype=float)
+    array_depth = df['Depth'].to_numpy(dtype=int)
+    float_demand_ratio: float = 1.0
+    dict_ratios: dict = {} # ratio of the new and current coefficient, by (product index, activity index)
+    for uid in sorted(
+        (uid for uid, dict_values in dict_edits.items() if 'SupplyAmount' in dict_values),
+        key=lambda uid: array_depth[tree['row'][uid]]
+    ):
+        # supply amount of the node under the changes of the edits above it (and of the same edge)
+        supply: float = array_supply[tree['row'][uid]] * float_demand_ratio
+        node: int = uid
+        while tree['parent'][node] >= 0:
+            supply *= dict_ratios.get((tree['product_index'][node], tree['activity_index'][tree['parent'][node]]), 1.0)
+            node = tree['parent'][node]
+        if supply == 0:
+            raise ValueError(f'The supply amount of node {uid} cannot be edited, since it is zero.')
+        ratio: float = dict_edits[uid]['SupplyAmount'] / supply
+        parent: int = tree['parent'][uid]
+        if parent < 0:
+            float_demand_ratio *= ratio
+        else:
+            key: tuple = (int(tree['product_index'][uid]), int(tree['activity_index'][parent]))
+            dict_ratios[key] = dict_ratios.get(key, 1.0) * ratio
 
+    dict_changes = {
+        'demand_ratio': dict_changes['demand_ratio'] * float_demand_ratio,
+        'technosphere': dict(dict_changes['technosphere']),
+        'intensity': dict(dict_changes['intensity']),
+    }
+    for key, ratio in dict_ratios.items():
+        dict_changes['technosphere'][key] = dict_changes['technosphere'].get(key, lca.technosphere_matrix[key]) * ratio
+    for uid, dict_values in dict_edits.items():
+        if 'BurdenIntensity' in dict_values:
+            dict_changes['intensity'][int(tree['activity_index'][uid])] = dict_values['BurdenIntensity']
+    return dict_changes
+
+
+def solve_technosphere_with_updates(
+        lca,
+        demand: np.ndarray,
+        dict_technosphere: dict,
+        dict_solves: dict | None = None,
+    ) -> np.ndarray:
+    """
+    Solves the technosphere system `A' x = f` for a technosphere matrix `A'`
+    which differs from the factorized technosphere matrix `A` of a `bw2calc.LCA` object in k coefficients,
+    without building or factorizing `A'`.
 
-    df['BurdenIntensity'] = df['BurdenIntensity_USER'].combine_first(df['BurdenIntensity'])
-    df = df.drop(columns=['BurdenIntensity_USER'])
+    The changes are written as a rank-k update `A' = A + U V^T`, where column j of `U` is the change of coefficient j
+    in its row and column j of `V` selects its column. With the Sherman-Morrison-Woodbury formula,
 
-    return df
+    x = A^-1 f - (A^-1 U) (I + V^T A^-1 U)^-1 V^T A^-1 f
 
+    only k + 1 solves with the existing factorization (see `solve_technosphere`) and one k-by-k dense solve are needed.
 
-def update_production_based_on_user_data(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Updates the production amount of all nodes which are upstream
-    of a node with user-supplied production amount.
-    If an upstream node has half the use-supplied production amount,
-    then the production amount of all downstream node is also halved.
+    If `dict_solves` is given, the solves are done for unit vectors `A^-1 e_i` of the rows i of the demand and of the changes,
+    which are kept in `dict_solves` by row. Repeated calls with more changes (see `panel_lca_class.update_data_based_on_user_input`)
+    then only solve for the rows which have not been solved before.
 
-    For instance, given a DataFrame of the kind:
+    Notes
+    -----
+    See also:
 
-    | UID | SupplyAmount | SupplyAmount_USER | Branch        |
-    |-----|--------------|-------------------|---------------|
-    | 0   | 1            | NaN               | NaN           |
-    | 1   | 0.5          | 0.25              | [0,1]         |
-    | 2   | 0.2          | NaN               | [0,1,2]       |
-    | 3   | 0.1          | NaN               | [0,3]         |
-    | 4   | 0.1          | 0.18              | [0,1,2,4]     |
-    | 5   | 0.05         | NaN               | [0,1,2,4,5]   |
-    | 6   | 0.01         | NaN               | [0,1,2,4,5,6] |
+    - https://en.wikipedia.org/wiki/Woodbury_matrix_identity
 
-    the function returns a DataFrame of the kind:
+    Parameters
+    ----------
+    lca : bw2calc.LCA
+        LCA object with factorized technosphere matrix.
+    demand : np.ndarray
+        Demand vector.
+    dict_technosphere : dict
+        New technosphere coefficients, by (product index, activity index).
+    dict_solves : dict | None
+        Solves `A^-1 e_i` of the unit vectors of the technosphere matrix, by row i. Is updated in place.
+
+    Raises
+    ------
+    np.linalg.LinAlgError
+        If the changed technosphere matrix is singular.
+    """
+    count: int = len(dict_technosphere)
+    if count > 0:
+        array_rows, array_columns = (np.array(indices, dtype=int) for indices in zip(*dict_technosphere.keys()))
+        array_delta = np.fromiter(dict_technosphere.values(), dtype=float) - np.asarray(
+            lca.technosphere_matrix[array_rows, array_columns]
+        ).ravel()
+    else:
+        array_rows = np.array([], dtype=int)
+
+    if dict_solves is None:
+        supply: np.ndarray = solve_technosphere(lca, demand)
+        if count == 0:
+            return supply
+        matrix_u = np.zeros((lca.technosphere_matrix.shape[0], count))
+        matrix_u[array_rows, np.arange(count)] = array_delta
+        matrix_z: np.ndarray = solve_technosphere(lca, matrix_u)
+    else:
+        array_demand_rows = np.flatnonzero(demand)
+        list_missing: list = sorted((set(array_demand_rows.tolist()) | set(array_rows.tolist())) - dict_solves.keys())
+        if list_missing:
+            matrix_unit = np.zeros((lca.technosphere_matrix.shape[0], len(list_missing)))
+            matrix_unit[list_missing, np.arange(len(list_missing))] = 1
+            dict_solves.update(zip(list_missing, solve_technosphere(lca, matrix_unit).T))
+        supply: np.ndarray = np.zeros(lca.technosphere_matrix.shape[0])
+        for row in array_demand_rows:
+            supply += dict_solves[row] * demand[row]
+        if count == 0:
+            return supply
+        matrix_z: np.ndarray = np.column_stack([dict_solves[row] for row in array_rows]) * array_delta
+    matrix_capacitance: np.ndarray = np.eye(count) + matrix_z[array_columns, :]
+    return supply - matrix_z @ np.linalg.solve(matrix_capacitance, supply[array_columns])
+
+
+def compute_lca_score_with_coefficient_changes(lca, demand: dict, dict_changes: dict, dict_solves: dict | None = None) -> float:
+    """
+    Returns the exact LCA score of the demand for the method of the `bw2calc.LCA` object,
+    with the coefficient changes of the user edits (see `get_coefficient_changes_from_user_edits`).
+    The factorized technosphere matrix is re-used (see `solve_technosphere_with_updates`, also for `dict_solves`).
+    """
+    array_demand = np.zeros(lca.technosphere_matrix.shape[0])
+    for node_id, amount in demand.items():
+        array_demand[lca.dicts.product[node_id]] = amount * dict_changes['demand_ratio']
+    array_intensity: np.ndarray = lca.biosphere_matrix.T @ lca.characterization_matrix.diagonal()
+    for activity_index, intensity in dict_changes['intensity'].items():
+        array_intensity[activity_index] = intensity
+    supply: np.ndarray = solve_technosphere_with_updates(lca, array_demand, dict_changes['technosphere'], dict_solves)
+    return float(array_intensity @ supply)
 
-    | UID | SupplyAmount      | Branch        |
-    |-----|-------------------|---------------|
-    | 0   | 1                 | NaN           |
-    | 1   | 0.25              | [0,1]         | NOTA BENE!
-    | 2   | 0.2 * (0.25/0.5)  | [0,1,2]       |
-    | 3   | 0.1               | [0,3]         |
-    | 4   | 0.18              | [0,1,2,4]     | NOTA BENE!
-    | 5   | 0.05 * (0.1/0.18) | [0,1,2,4,5]   |
-    | 6   | 0.01 * (0.1/0.18) | [0,1,2,4,5,6] |
 
-    Notes
-    -----
+def solve_technosphere_transposed(lca, vector: np.ndarray) -> np.ndarray:
+    """
+    Solves the transposed technosphere system `A^T y = v` of a `bw2calc.LCA` object.
 
-    As we can see, the function updates production only
-    for those nodes upstream of a node with 'production_user':
+    With the dense inverse of the technosphere matrix (see `dense_inverse_solver_class`), this is a matrix-vector product.
+    Else, the transposed technosphere matrix is factorized once per project and process (see `get_shared_cache`),
+    since the factorized solver of `bw2calc` only solves the untransposed system.
+    """
+    solver = getattr(lca, 'solver', None)
+    if isinstance(solver, dense_inverse_solver_class):
+        return solver.inverse.T @ vector
+    solver_transposed = get_shared_cache(
+        ('technosphere_transposed_solver', bd.projects.current),
+        sparse.linalg.factorized,
+        lca.technosphere_matrix.T.tocsc()
+    )
+    return solver_transposed(vector)
 
-    - Node 2 is upstream of node 1, which has a 'production_user' value.
-    - Node 3 is NOT upstream of node 1. It is upstream of node 0, but node 0 does not have a 'production_user' value.
 
-    As we can see, the function always takes the "most recent"
-    'production_user' value upstream of a node:
+def compute_exchange_sensitivities(lca, demand: dict) -> dict:
+    """
+    Computes the sensitivity of the LCA score to every exchange of the technosphere matrix
+    with one transposed solve (adjoint method), for the method of the `bw2calc.LCA` object.
 
-    - Node 5 is upstream of node 4, which has a 'production_user' value.
-    - Node 4 is upstream of node 1, which also has a 'production_user' value.
+    With the characterized direct intensities of the activities `h = B^T c`, the supply vector `x = A^-1 f`
+    and the adjoint vector `y = A^-T h` (the total intensity of every product), the score is `s = h^T x = y^T f`
+    and its derivative by every coefficient of the technosphere matrix is
 
-    In this case, the function takes the 'production_user' value of node 4, not of node 1.
+    ds/dA_ij = -y_i x_j
 
-    Parameters
-    ----------
-    df : pd.DataFrame
-        Input DataFrame. Must have the columns 'production', 'production_user' and 'branch'.
+    which is evaluated for all non-zero coefficients at once.
+    The sensitivity is the elasticity of the score: the relative change of the score
+    per relative change of the coefficient, `A_ij (ds/dA_ij) / s`.
+    A sensitivity of 0.2 means that using 1% more of the input changes the score by 0.2%.
 
     Returns
     -------
-    pd.DataFrame
-        Output DataFrame.
+    dict
+        Dictionary with keys 'method', 'demand', 'score', 'adjoint' and 'supply', and the arrays
+        'rows', 'columns', 'coefficient', 'sensitivity' and 'is_production' of all non-zero technosphere coefficients.
     """
+    array_demand = np.zeros(lca.technosphere_matrix.shape[0])
+    for node_id, amount in demand.items():
+        array_demand[lca.dicts.product[node_id]] = amount
+    array_intensity: np.ndarray = lca.biosphere_matrix.T @ lca.characterization_matrix.diagonal()
+    array_supply: np.ndarray = solve_technosphere(lca, array_demand)
+    array_adjoint: np.ndarray = solve_technosphere_transposed(lca, array_intensity)
+    float_score: float = float(array_adjoint @ array_demand)
+
+    matrix = lca.technosphere_matrix.tocoo()
+    array_derivative = -array_adjoint[matrix.row] * array_supply[matrix.col]
+    array_production_rows, array_production_columns = bgt.guess_production_exchanges(lca.technosphere_mm)
+    return {
+        'method': lca.method,
+        'demand': dict(demand),
+        'score': float_score,
+        'adjoint': array_adjoint,
+        'supply': array_supply,
+        'rows': matrix.row,
+        'columns': matrix.col,
+        'coefficient': matrix.data,
+        'sensitivity': matrix.data * array_derivative / float_score if float_score != 0 else np.zeros(len(matrix.data)),
+        'is_production': np.isin(
+            matrix.row * matrix.shape[1] + matrix.col,
+            array_production_rows * matrix.shape[1] + array_production_columns
+        ),
+    }
 
-    df_filtered = df[~df['SupplyAmount_USER'].isna()]
-    dict_user_input = df_filtered.set_index('UID').to_dict()['SupplyAmount_USER']
-    
+
+def create_sensitivity_ranking(lca, dict_sensitivity: dict, int_top_exchanges: int = 20) -> pd.DataFrame:
     """
-    For the example DataFrame from the docstrings above,
-    the dict_user_input would be:
+    Returns the exchanges with the largest absolute sensitivity (see `compute_exchange_sensitivities`),
+    without the production exchanges.
 
-    dict_user_input = {
-        1: 0.25,
-        4: 0.18
-    }
+    | Product      | Consumer    | Amount | Sensitivity |
+    |--------------|-------------|--------|-------------|
+    | Commodity 18 | Commodity 3 | 0.185  | 0.21        |
+    | Commodity 29 | Commodity 3 | 0.184  | 0.12        |
+
+    'Amount' is the amount of the product used per unit of the consuming activity.
+    """
+    array_candidates = np.flatnonzero(~dict_sensitivity['is_production'])
+    array_sensitivity = dict_sensitivity['sensitivity'][array_candidates]
+    if len(array_candidates) > int_top_exchanges:
+        array_top = np.argpartition(-np.abs(array_sensitivity), int_top_exchanges)[:int_top_exchanges]
+    else:
+        array_top = np.arange(len(array_candidates))
+    array_top = array_top[np.argsort(-np.abs(array_sensitivity[array_top]), kind='stable')]
+    array_exchanges = array_candidates[array_top]
+
+    list_product_ids: list = [lca.dicts.product.reversed[index] for index in dict_sensitivity['rows'][array_exchanges]]
+    list_consumer_ids: list = [lca.dicts.activity.reversed[index] for index in dict_sensitivity['columns'][array_exchanges]]
+    series_names: pd.Series = get_node_metadata(list_product_ids + list_consumer_ids)['name']
+    return pd.DataFrame({
+        'Product': series_names.reindex(list_product_ids).to_numpy(),
+        'Consumer': series_names.reindex(list_consumer_ids).to_numpy(),
+        'Amount': -dict_sensitivity['coefficient'][array_exchanges],
+        'Sensitivity': dict_sensitivity['sensitivity'][array_exchanges],
+    })
+
+
+def get_traversal_sensitivities(lca, tree: dict, df: pd.DataFrame, dict_sensitivity: dict) -> np.ndarray:
+    """
+    Returns the sensitivity of the LCA score (see `compute_exchange_sensitivities`)
+    to the edge of every row of the tabulator dataframe, ie. to the technosphere coefficient
+    (product of the node, activity of the parent node) which a user edit of the supply amount changes
+    (see `get_coefficient_changes_from_user_edits`).
+    The sensitivity of the root node is the sensitivity to the demand, which is 1.
     """
+    array_uid = df['UID'].to_numpy(dtype=int)
+    array_parent = tree['parent'][array_uid]
+    is_edge = array_parent >= 0
+    array_rows = tree['product_index'][array_uid[is_edge]]
+    array_columns = tree['activity_index'][array_parent[is_edge]]
+    array_coefficient = np.asarray(lca.technosphere_matrix[array_rows, array_columns]).ravel()
+
+    array_sensitivity = np.ones(len(array_uid))
+    if dict_sensitivity['score'] != 0:
+        array_sensitivity[is_edge] = (
+            -array_coefficient * dict_sensitivity['adjoint'][array_rows] * dict_sensitivity['supply'][array_columns]
+            / dict_sensitivity['score']
+        )
+    else:
+        array_sensitivity[:] = 0
+    return array_sensitivity
 
-    df = df.copy(deep=True)
-    def multiplier(row):
-        if not isinstance(row['Branch'], list):
-            return row['SupplyAmount']
-        elif (
-            not np.isnan(row['SupplyAmount_USER'])
-        ):
-            return row['SupplyAmount_USER']
-        elif (
-            set(dict_user_input.keys()).intersection(row['Branch'])
-        ):
-            for branch_UID in reversed(row['Branch']):
-                if branch_UID in dict_user_input.keys():
-                    return row['SupplyAmount'] * dict_user_input[branch_UID]
-        else:
-            return row['SupplyAmount']
 
-    df['SupplyAmount_EDITED'] = df.apply(multiplier, axis=1)
+def update_traversal_based_on_coefficient_changes(
+        df: pd.DataFrame,
+        tree: dict,
+        dict_changes: dict,
+        dict_overrides: dict,
+        lca,
+        dict_changes_previous: dict | None = None,
+    ) -> pd.DataFrame:
+    """
+    Updates supply amounts, burden intensities and burdens of the tabulator dataframe
+    from the coefficient changes of the previous rounds of user edits to those of the current round
+    (see `get_coefficient_changes_from_user_edits`).
 
-    df.drop(columns=['SupplyAmount_USER'], inplace=True)
-    df['SupplyAmount'] = df['SupplyAmount_EDITED']
-    df.drop(columns=['SupplyAmount_EDITED'], inplace=True)
+    The supply amount of every node is the supply amount of its parent node times the technosphere coefficient of their edge.
+    The supply amount of a node therefore changes by the product of the ratios of the new and previous coefficients
+    of all edges on its branch (and the demand ratio):
 
-    return df
+    | UID | SupplyAmount | Branch    | coefficient ratio | SupplyAmount (updated) |
+    |-----|--------------|-----------|-------------------|------------------------|
+    | 0   | 1            | NaN       | 1                 | 1                      |
+    | 1   | 0.5          | [0,1]     | 0.5               | 0.25                   |
+    | 2   | 0.2          | [0,1,2]   | 1                 | 0.1                    |
+    | 3   | 0.1          | [0,3]     | 1                 | 0.1                    |
+    | 4   | 0.1          | [0,1,2,4] | 1.8               | 0.09                   |
 
+    All nodes with the same edge (same parent activity and product) are updated, on all branches.
+    Only the coefficients changed in the current round are applied, and only rows whose values change are written to the dataframe.
 
-def update_burden_based_on_user_data(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Updates the environmental burden of nodes
-    by multiplying the burden intensity and the supply amount.
+    Notes
+    -----
+    The products of the ratios along the branches are computed by pointer jumping (see `compute_branches`),
+    in O(N log(depth)) vectorized operations.
 
     Parameters
     ----------
     df : pd.DataFrame
-        Input dataframe.
+        Tabulator dataframe with the coefficient changes of the previous rounds. Is updated in place and returned.
+    tree : dict
+        Tree structure of the dataframe (see `build_traversal_tree`).
+    dict_changes : dict
+        Coefficient changes of all rounds (see `get_coefficient_changes_from_user_edits`).
+    dict_overrides : dict
+        User-supplied values of all rounds, by `unique_id` and column. These rows are marked in the column 'Edited?'.
+    lca : bw2calc.LCA
+        LCA object of the graph traversal.
+    dict_changes_previous : dict | None
+        Coefficient changes of the previous rounds. `None` if there are none.
 
     Returns
     -------
     pd.DataFrame
-        Output dataframe.
+        Updated dataframe.
     """
-
-    df['Burden(Direct)'] = df['SupplyAmount'] * df['BurdenIntensity']
+    if dict_changes_previous is None:
+        dict_changes_previous = {'demand_ratio': 1.0, 'technosphere': {}, 'intensity': {}}
+    if 'Edited?' not in df.columns:
+        df['Edited?'] = False
+    parent: np.ndarray = tree['parent']
+    row: np.ndarray = tree['row']
+
+    # ratio of the new and previous coefficient of the edge from the parent node, by unique_id
+    ratio = np.ones(len(parent))
+    is_root = (parent < 0) & (row >= 0)
+    ratio[is_root] = dict_changes['demand_ratio'] / dict_changes_previous['demand_ratio']
+    dict_ratios: dict = {
+        key: coefficient / dict_changes_previous['technosphere'].get(key, lca.technosphere_matrix[key])
+        for key, coefficient in dict_changes['technosphere'].items()
+        if coefficient != dict_changes_previous['technosphere'].get(key)
+    }
+    if dict_ratios:
+        array_uid = np.flatnonzero((parent >= 0) & (row >= 0))
+        array_keys = tree['product_index'][array_uid] * lca.technosphere_matrix.shape[1] + tree['activity_index'][parent[array_uid]]
+        for (product_index, activity_index), ratio_edge in dict_ratios.items():
+            is_edge = array_keys == product_index * lca.technosphere_matrix.shape[1] + activity_index
+            ratio[array_uid[is_edge]] = ratio_edge
+
+    # product of the ratios along the branch
+    jump = parent.copy()
+    while (jump >= 0).any():
+        has_jump = jump >= 0
+        ratio_next = ratio.copy()
+        ratio_next[has_jump] *= ratio[jump[has_jump]]
+        jump[has_jump] = jump[jump[has_jump]]
+        ratio = ratio_next
+
+    array_df_uid = df['UID'].to_numpy(dtype=int)
+    array_supply_previous = df['SupplyAmount'].to_numpy(dtype=float)
+    array_intensity_previous = df['BurdenIntensity'].to_numpy(dtype=float)
+    array_supply = array_supply_previous * ratio[array_df_uid]
+    array_intensity = array_intensity_previous.copy()
+    array_activity_index = tree['activity_index'][array_df_uid]
+    for activity_index, intensity in dict_changes['intensity'].items():
+        if intensity != dict_changes_previous['intensity'].get(activity_index):
+            array_intensity[array_activity_index == activity_index] = intensity
+    array_edited = np.array([uid in dict_overrides for uid in array_df_uid])
+
+    is_changed = (
+        (array_supply != array_supply_previous) |
+        (array_intensity != array_intensity_previous) |
+        (array_edited != df['Edited?'].to_numpy(dtype=bool))
+    )
+    index_rows = df.index[is_changed]
+    df.loc[index_rows, 'SupplyAmount'] = array_supply[is_changed]
+    df.loc[index_rows, 'BurdenIntensity'] = array_intensity[is_changed]
+    df.loc[index_rows, 'Burden(Direct)'] = array_supply[is_changed] * array_intensity[is_changed]
+    df.loc[index_rows, 'Edited?'] = array_edited[is_changed]
     return df
 
 
-def determine_edited_rows(df: pd.DataFrame) -> pd.DataFrame:
+def get_production_activity_id(lca, product_id: int) -> int:
     """
-    Determines which rows have been edited by the user.
+    Returns the node id of the activity producing the product `product_id` in the technosphere of a `bw2calc.LCA` object
+    (see `bw_graph_tools.guess_production_exchanges`). Product and activity ids differ in databases with separate product and process nodes.
+    """
+    array_production_rows, array_production_columns = bgt.guess_production_exchanges(lca.technosphere_mm)
+    activity_index: int = int(array_production_columns[array_production_rows == lca.dicts.product[product_id]][0])
+    return lca.dicts.activity.reversed[activity_index]
 
-    For instance, given a DataFrame of the kind:
 
-    | UID | SupplyAmount_USER | BurdenIntensity_USER |
-    |-----|-------------------|----------------------|
-    | 0   | NaN               | NaN                  |
-    | 1   | 0.25              | NaN                  |
-    | 2   | NaN               | 2.1                  |
-    | 3   | NaN               | NaN                  |
+def create_monte_carlo_executor(int_processes: int) -> ProcessPoolExecutor:
+    """
+    Returns a pool of `int_processes` worker processes for the Monte Carlo simulation
+    (see `iterate_monte_carlo_batches_in_processes`).
+
+    The worker processes are started with `spawn` instead of `fork`,
+    since forking from a thread of the (multi-threaded) server can deadlock the worker processes.
+    They add the directory of this script to the module search path, so that they can import the module `montecarlo_worker`,
+    which only imports NumPy, SciPy and `bw2calc`, instead of this script.
+    The pool is kept for the lifetime of the server process (see `get_shared_cache`),
+    so that the start-up of the worker processes is only paid once.
+    """
+    return ProcessPoolExecutor(
+        max_workers=int_processes,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=site.addsitedir,
+        initargs=(str(Path(__file__).parent),),
+    )
 
-    the function returns a DataFrame of the kind:
 
-    | UID | SupplyAmount_USER | BurdenIntensity_USER | Edited? |
-    |-----|-------------------|----------------------|---------|
-    | 0   | NaN               | NaN                  | False   |
-    | 1   | 0.25              | NaN                  | True    |
-    | 2   | NaN               | 2.1                  | True    |
-    | 3   | NaN               | NaN                  | False   |
+def iterate_monte_carlo_batches_in_processes(int_processes: int, iterations: int, seed: int, batch_size: int, **kwargs):
     """
-    df['Edited?'] = df[['SupplyAmount_USER', 'BurdenIntensity_USER']].notnull().any(axis=1)
-    return df
+    Runs the Monte Carlo iterations (see `montecarlo_worker.iterate_monte_carlo_batches`) in `int_processes` worker processes
+    (see `create_monte_carlo_executor`) and yields the batches as they are completed.
+
+    Every batch is a task of its own, with its own seed, which receives the datapackages
+    (file system references, see `bw_processing.Datapackage`) instead of a loaded `bw2calc.LCA` object.
+    At most two tasks per worker process are pending at any time,
+    so that no tasks are left over if the consumer stops iterating (eg. because the results have converged).
+
+    Raises
+    ------
+    RuntimeError
+        If a worker process fails.
+    """
+    key: tuple = ('monte_carlo_executor', int_processes)
+    executor: ProcessPoolExecutor = get_shared_cache(key, create_monte_carlo_executor, int_processes)
+    set_pending: set = set()
+    int_submitted: int = 0
+    try:
+        while int_submitted < iterations or set_pending:
+            while int_submitted < iterations and len(set_pending) < 2 * int_processes:
+                size: int = min(batch_size, iterations - int_submitted)
+                set_pending.add(executor.submit(
+                    montecarlo_worker.run_monte_carlo_worker,
+                    seed=seed + int_submitted,
+                    iterations=size,
+                    batch_size=size,
+                    **kwargs
+                ))
+                int_submitted += size
+            set_done, set_pending = wait(set_pending, return_when=FIRST_COMPLETED)
+            for future in set_done:
+                yield future.result()
+    except BrokenProcessPool as error:
+        pn.state.cache.pop(key, None)
+        raise RuntimeError(f'Monte Carlo worker process failed: {error!r}') from error
+    except Exception as error:
+        raise RuntimeError(f'Monte Carlo worker process failed: {error!r}') from error
+    finally:
+        for future in set_pending:
+            future.cancel()
+
+
+def compute_monte_carlo_statistics(samples: np.ndarray) -> pd.DataFrame:
+    """
+    Returns the mean and percentiles of the score and of the scope shares of the Monte Carlo samples
+    (see `montecarlo_worker.iterate_monte_carlo_batches`). The 2.5% and 97.5% percentiles are the bounds of the 95% interval.
+
+    | Result        | Mean  | 2.5%  | 50%   | 97.5% |
+    |---------------|-------|-------|-------|-------|
+    | Score         | 504.1 | 421.7 | 498.3 | 612.0 |
+    | Scope 1 Share | 0.59  | 0.48  | 0.59  | 0.69  |
+    | Scope 2 Share | 0.01  | 0.01  | 0.01  | 0.02  |
+    | Scope 3 Share | 0.40  | 0.30  | 0.40  | 0.51  |
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        array_results = np.column_stack([samples[:, 0], samples[:, 1:] / samples[:, [0]]])
+    return pd.DataFrame({
+        'Result': ['Score', 'Scope 1 Share', 'Scope 2 Share', 'Scope 3 Share'],
+        'Mean': np.nanmean(array_results, axis=0),
+        '2.5%': np.nanpercentile(array_results, 2.5, axis=0),
+        '50%': np.nanpercentile(array_results, 50, axis=0),
+        '97.5%': np.nanpercentile(array_results, 97.5, axis=0),
+    })
 
 
 def create_plotly_figure_piechart(data_dict: dict) -> plotly.graph_objects.Figure:
@@ -517,7 +1636,7 @@ def generate_table_filename() -> str:
     """
     str_filename: str = (
         "activity='"
-        + panel_lca_class_instance.chosen_activity['name'].replace(' ', '_').replace(';', '') .replace(',', '')
+        + panel_lca_class_instance.chosen_activity_name.replace(' ', '_').replace(';', '') .replace(',', '')
         + "'_method='"
         + '-'.join(panel_lca_class_instance.chosen_method.name).replace(' ', '-')
         + "'_cutoff=" 
@@ -527,21 +1646,258 @@ def generate_table_filename() -> str:
     return str_filename
 
 
-def determine_scope_emissions(df: pd.DataFrame):
+def get_tabulator_csv(widget: pn.widgets.Tabulator) -> io.StringIO:
+    """
+    Returns all rows of the dataframe of a tabulator widget as CSV file, without the hidden columns.
+
+    The file is written on the server, since the download of the browser (see `pn.widgets.Tabulator.download_menu`)
+    only contains the rows loaded in the browser, which is a single page with remote pagination (see `set_tabulator_value`).
+
+    Parameters
+    ----------
+    widget : pn.widgets.Tabulator
+        Tabulator widget.
+
+    Returns
+    -------
+    io.StringIO
+        CSV file, for use in a `pn.widgets.FileDownload` widget.
+    """
+    file = io.StringIO()
+    widget.value.drop(columns=widget.hidden_columns, errors='ignore').to_csv(file, index=False)
+    file.seek(0)
+    return file
+
+
+def determine_scope_emissions(df: pd.DataFrame, int_top_activities: int = 10) -> dict:
+    """
+    Determines the scope 1/2/3 emissions from the graph traversal nodes dataframe,
+    broken down by depth and by contributing activity.
+
+    All totals are computed with weighted `np.bincount` aggregations over the columns of the dataframe,
+    without filtering the dataframe by scope. Rows with a scope other than 1 or 2 are counted as scope 3.
+
+    For example:
+
+    dict_scope = {
+        'Scope': {'Scope 1': 299.6, 'Scope 2': 4.8, 'Scope 3': 113.7},
+        'Depth': pd.DataFrame(...),
+        'Activities': pd.DataFrame(...),
+    }
+
+    where 'Depth' is a dataframe of the kind:
+
+    | Depth | Scope 1 | Scope 2 | Scope 3 |
+    |-------|---------|---------|---------|
+    | 1     | 299.6   | 0       | 0       |
+    | 2     | 0       | 0       | 79.1    |
+    | 3     | 0       | 4.8     | 34.6    |
+
+    and 'Activities' is a dataframe of the largest contributing activities of every scope:
+
+    | Scope | Name         | Burden(Direct) | Share |
+    |-------|--------------|----------------|-------|
+    | 1     | Commodity 3  | 299.6          | 0.72  |
+    | 2     | Commodity 24 | 4.8            | 0.01  |
+    | 3     | Commodity 14 | 28.3           | 0.07  |
+    | 3     | Commodity 13 | 24.9           | 0.06  |
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Dataframe with columns 'Scope', 'Depth', 'Name', 'activity_datapackage_id' and 'Burden(Direct)'.
+    int_top_activities : int
+        Maximum number of activities per scope in the 'Activities' dataframe.
+
+    Returns
+    -------
+    dict
+        Dictionary with keys 'Scope', 'Depth' and 'Activities'.
+    """
+    array_burden = df['Burden(Direct)'].to_numpy(dtype=float)
+    array_scope = pd.to_numeric(df['Scope'], errors='coerce').to_numpy()
+    array_scope = np.where((array_scope == 1) | (array_scope == 2), array_scope, 3).astype(int)
+    array_depth = df['Depth'].to_numpy(dtype=int)
+    list_scopes: list = ['Scope 1', 'Scope 2', 'Scope 3']
+
+    array_scope_totals = np.bincount(array_scope, weights=array_burden, minlength=4)[1:]
+    array_depth_totals = np.bincount(
+        array_depth * 4 + array_scope,
+        weights=array_burden,
+        minlength=(array_depth.max(initial=0) + 1) * 4
+    ).reshape(-1, 4)[:, 1:]
+    array_has_depth = np.bincount(array_depth, minlength=len(array_depth_totals)) > 0
+
+    # totals by activity and scope, ordered by scope and descending absolute burden
+    array_codes, array_keys = pd.factorize(df['activity_datapackage_id'].to_numpy(dtype=int) * 4 + array_scope)
+    array_activity_totals = np.bincount(array_codes, weights=array_burden, minlength=len(array_keys))
+    array_first_row = np.full(len(array_keys), len(array_codes))
+    np.minimum.at(array_first_row, array_codes, np.arange(len(array_codes)))
+    array_activity_scope = array_keys % 4
+    order = np.lexsort((-np.abs(array_activity_totals), array_activity_scope))
+    array_rank = np.arange(len(order)) - np.searchsorted(array_activity_scope[order], array_activity_scope[order])
+    order = order[array_rank < int_top_activities]
+
+    float_total: float = array_scope_totals.sum()
+    return {
+        'Scope': dict(zip(list_scopes, array_scope_totals.tolist())),
+        'Depth': pd.DataFrame(
+            array_depth_totals[array_has_depth],
+            columns=list_scopes,
+            index=pd.Index(np.flatnonzero(array_has_depth), name='Depth'),
+        ),
+        'Activities': pd.DataFrame({
+            'Scope': array_activity_scope[order],
+            'Name': df['Name'].to_numpy()[array_first_row[order]],
+            'Burden(Direct)': array_activity_totals[order],
+            'Share': array_activity_totals[order] / float_total if float_total != 0 else np.nan,
+        }),
+    }
+
+
+@functools.cache
+def get_resumable_graph_traversal_class() -> type:
+    """
+    Returns the class `resumable_graph_traversal_class`.
+    The class is only defined on first use, since its base class requires importing `bw_graph_tools`.
+    """
+    class resumable_graph_traversal_class(bgt.NewNodeEachVisitGraphTraversal):
         """
-        Determines the scope 1/2/3 emissions from the graph traversal nodes dataframe.
+        Graph traversal which can be resumed with a lower cutoff, and filtered to a higher cutoff.
+
+        Every supply chain edge which is skipped because its cumulative score is below the cutoff
+        is recorded in `list_pruned_edges`. Lowering the cutoff (see `resume`) then only expands these
+        pruned edges (and the supply chains below them), instead of traversing the graph from the root again.
+        Raising the cutoff (see `get_traversal_arrays`) filters the nodes and edges already traversed,
+        without any new calculation.
+        Nodes which were not expanded because the maximum number of calculations was exceeded
+        are recorded in `list_unexpanded_nodes`, and are expanded when the traversal is resumed.
+
+        Notes
+        -----
+        The technosphere matrix of the `bw2calc.LCA` object must not change between calls,
+        since the traversal re-uses its (factorized) linear system solver.
+        The demand and method of the `bw2calc.LCA` object may change in the meantime.
         """
-        dict_scope = {
-            'Scope 1': 0,
-            'Scope 2': 0,
-            'Scope 3': 0
-        }
-        
-        dict_scope['Scope 1'] = df.loc[(df['Scope'] == 1)]['Burden(Direct)'].values.sum()
-        dict_scope['Scope 2'] = df.loc[(df['Scope'] == 2)]['Burden(Direct)'].values.sum()
-        dict_scope['Scope 3'] = df['Burden(Direct)'].sum() - dict_scope['Scope 1'] - dict_scope['Scope 2']
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.float_total_score: float = self.lca.score
+            self.list_pruned_edges: list = []
+            self.list_unexpanded_nodes: list = []
+
+
+        def _traverse(self, heap: list, max_depth: int | None = None) -> None:
+            """
+            Traverses the graph from the nodes on the heap, and records the nodes left on the heap
+            (if the maximum number of calculations was exceeded) in `list_unexpanded_nodes`.
+            """
+            super()._traverse(heap, max_depth=max_depth)
+            self.list_unexpanded_nodes = heap
+
+
+        def traverse_edges(self, *, consumer_unique_id: int, product_indices: list, product_amounts: list, edges: list, **kwargs) -> None:
+            """
+            Traverses the edges one by one, and records edges skipped because of the cutoff
+            as (consumer_unique_id, product_index, product_amount) in `list_pruned_edges`.
+            """
+            for product_index, product_amount in zip(product_indices, product_amounts):
+                count_edges: int = len(edges)
+                super().traverse_edges(
+                    consumer_unique_id=consumer_unique_id,
+                    product_indices=[product_index],
+                    product_amounts=[product_amount],
+                    edges=edges,
+                    **kwargs
+                )
+                if (
+                    len(edges) == count_edges and
+                    self.production_exchange_mapping[product_index] not in self.static_activity_indices
+                ):
+                    self.list_pruned_edges.append((consumer_unique_id, product_index, product_amount))
+
+
+        def resume(self, cutoff: float) -> None:
+            """
+            Lowers the cutoff of the graph traversal and expands only the previously pruned edges
+            which are above the new cutoff, as well as the nodes which were not expanded before
+            because the maximum number of calculations was exceeded.
+
+            Parameters
+            ----------
+            cutoff : float
+                New cutoff value. Fraction of total score, should be lower than the current cutoff.
+            """
+            self.settings.cutoff = cutoff
+            self.cutoff_score = abs(self.float_total_score * cutoff)
+            self._max_calc += self.settings.max_calc
+
+            list_pruned_edges: list = self.list_pruned_edges
+            self.list_pruned_edges = []
+            heap: list = self.list_unexpanded_nodes
+            self.list_unexpanded_nodes = []
+            for consumer_unique_id, product_index, product_amount in list_pruned_edges:
+                consumer: Node = self._nodes[consumer_unique_id]
+                self.traverse_edges(
+                    consumer_index=consumer.activity_index,
+                    consumer_unique_id=consumer_unique_id,
+                    consumer_max_depth=consumer.max_depth,
+                    product_indices=[product_index],
+                    product_amounts=[product_amount],
+                    lca=self.lca,
+                    current_depth=consumer.depth,
+                    max_depth=self.settings.max_depth,
+                    calculation_count=self._calculation_count,
+                    characterized_biosphere=self.characterized_biosphere,
+                    matrix=self.lca.technosphere_matrix,
+                    edges=self._edges,
+                    flows=self._flows,
+                    nodes=self._nodes,
+                    heap=heap,
+                    caching_solver=self._caching_solver,
+                    static_activity_indices=self.static_activity_indices,
+                    production_exchange_mapping=self.production_exchange_mapping,
+                    separate_biosphere_flows=self.settings.separate_biosphere_flows,
+                    cutoff_score=self.cutoff_score,
+                    biosphere_cutoff_score=self.biosphere_cutoff_score,
+                )
+            self._traverse(heap, max_depth=self.settings.max_depth)
+
+            non_terminal_nodes: set = {edge.consumer_unique_id for edge in self._edges}
+            for key, node in self._nodes.items():
+                node.terminal = key not in non_terminal_nodes
+
+
+        def get_traversal_arrays(self, cutoff: float) -> dict:
+            """
+            Returns the graph traversal above a given cutoff in columnar form (see `create_graph_traversal_arrays`).
+
+            Edges are stored in the order in which their producer nodes were created,
+            so that a single pass keeps every node which is above the cutoff and whose consumer is kept.
+
+            Parameters
+            ----------
+            cutoff : float
+                Cutoff value. Fraction of total score, should be equal to or higher than the current cutoff.
+
+            Returns
+            -------
+            dict
+                Dictionary of NumPy arrays, one entry per node of the graph traversal (without the functional unit node).
+            """
+            cutoff_score: float = abs(self.float_total_score * cutoff)
+            set_kept_nodes: set = {self._functional_unit_unique_id}
+            list_edges: list = []
+            for edge in self._edges:
+                if (
+                    edge.consumer_unique_id in set_kept_nodes and
+                    abs(self._nodes[edge.producer_unique_id].cumulative_score) >= cutoff_score
+                ):
+                    set_kept_nodes.add(edge.producer_unique_id)
+                    list_edges.append(edge)
+            return create_graph_traversal_arrays(nodes=self._nodes, edges=list_edges)
+
+    return resumable_graph_traversal_class
 
-        return dict_scope
 
 class panel_lca_class:
     """
@@ -557,23 +1913,55 @@ class panel_lca_class:
     def __init__(self):
         self.db_name = 'USEEIO-1.1'
         self.db = None
+        self.array_scope_2_activity_ids = np.array([], dtype=int)
+        self.product_catalogue = {}
         self.list_db_products = []
+        self.int_autocomplete_max_options = 5000
+        self.int_tabulator_max_local_rows = 1000
         self.dict_db_methods = {}
         self.list_db_methods = []
-        self.chosen_activity = ''
+        self.chosen_activity_id = None
+        self.chosen_activity_name = ''
         self.chosen_method = ''
         self.chosen_method_unit = ''
         self.chosen_amount = 0
         self.lca = None
+        self.dict_lca_cache = {}
+        self.dict_lcia_cache = get_shared_cache(('dict_lcia_cache',), dict)
+        self.bool_compute_all_methods = True
+        self.dict_lca_scores = {}
         self.scope_dict = {'Scope 1':0, 'Scope 2':0, 'Scope 3':0}
+        self.dict_scope_breakdown = {}
+        self.df_portfolio = None
+        self.df_portfolio_scores = None
+        self.dict_sensitivity = {}
+        self.df_sensitivity_ranking = None
+        self.int_sensitivity_top_exchanges = 20
+        self.int_monte_carlo_iterations = 1000
+        self.int_monte_carlo_min_iterations = 200
+        self.int_monte_carlo_batch_size = 50
+        self.int_monte_carlo_processes = min(4, os.cpu_count() or 1)
+        self.float_monte_carlo_tolerance = 0.005
+        self.dict_monte_carlo = {}
         self.graph_traversal_cutoff = 1
         self.graph_traversal = {}
+        self.dict_graph_traversal_cache = OrderedDict()
+        self.int_graph_traversal_cache_max_bytes = 64 * 1024**2
+        self.graph_traversal_state = None
+        self.graph_traversal_state_key = None
+        self.graph_traversal_state_amount = 0
         self.df_graph_traversal_nodes = None
         self.df_graph_traversal_edges = None
         self.df_tabulator_from_traversal = None
-        self.df_tabulator_from_user = None
         self.df_tabulator = None # nota bene: gets updated automatically when cells in the tabulator are edited # https://panel.holoviz.org/reference/widgets/Tabulator.html#editors-editing
-        self.bool_user_provided_data = False
+        self.dict_traversal_tree = {}
+        self.list_tabulator_edits = []
+        self.dict_user_overrides = {}
+        self.dict_coefficient_changes = None
+        self.dict_technosphere_solves = {}
+        self.float_lca_score_user_input = None
+        self.int_calculation_id = 0
+        self.calculation_lock = asyncio.Lock()
 
 
     def set_db(self, event):
@@ -583,14 +1971,45 @@ class panel_lca_class:
         Else just sets the current project to USEEIO-1.1.
         """
         check_for_useeio_brightway_project(event)
-        self.db = bd.Database(self.db_name)
+        self.db = get_shared_cache(('db', bd.projects.current, self.db_name), bd.Database, self.db_name)
+        self.array_scope_2_activity_ids = get_shared_cache(
+            ('scope_2_activity_ids', bd.projects.current, self.db_name),
+            get_scope_2_activity_ids,
+            self.db_name
+        )
 
 
     def set_list_db_products(self, event):
         """
-        Sets `list_db_products` to a list of product names from the database for use in the autocomplete widget.
+        Sets `product_catalogue` to the indexed product catalogue of the database (see `load_product_catalogue`)
+        and `list_db_products` to the list of product names for use in the autocomplete widget.
         """
-        self.list_db_products = [node['name'] for node in self.db if 'product' in node['type']]
+        self.product_catalogue = get_shared_cache(
+            ('product_catalogue', bd.projects.current, self.db_name),
+            load_product_catalogue, self.db_name
+        )
+        self.list_db_products = self.product_catalogue['names']
+
+
+    def get_dict_db_products(self, indices: list = None) -> dict:
+        """
+        Returns a dictionary of product labels and node ids, for use as options of the autocomplete widget.
+        If `indices` is given, only the products with these indices in the catalogue are returned (see `search_product_catalogue`).
+
+        Example:
+        --------
+        dict_db_products = {
+            'Oilseeds; at farm': 1,
+            'Grains; at farm': 2,
+            ...
+        }
+        """
+        if indices is None:
+            return self.product_catalogue['dict_labels_to_ids']
+        return {
+            self.product_catalogue['labels'][index]: self.product_catalogue['ids'][index]
+            for index in indices
+        }
     
 
     def set_methods_objects(self, event):
@@ -692,57 +2111,413 @@ class panel_lca_class:
             ...
         ]
         """
-        list_methods_for_autocomplete = [(key, value[1], value[2]) for key, value in dict_methods_enriched.items()]
+        list_methods_for_autocomplete = [(key, value[1], value[2]) for key, value in dict_methods_enriched.items()]
+
+        self.dict_db_methods, self.list_db_methods = get_shared_cache(
+            ('db_methods', bd.projects.current),
+            lambda: (dict_methods_enriched, list_methods_for_autocomplete)
+        )
+
+
+    def set_chosen_activity(self, event):
+        """
+        Sets `chosen_activity_id` and `chosen_activity_name` to the node id and name of the chosen product from the autocomplete widget.
+        The autocomplete widget carries the node ids as option values, which are resolved with the in-memory product catalogue,
+        so that no database query is necessary.
+        """
+        self.chosen_activity_id: int = widget_autocomplete_product.value
+        self.chosen_activity_name: str = self.product_catalogue['dict_ids_to_names'][self.chosen_activity_id]
+
+
+    def set_chosen_method_and_unit(self, event):
+        """
+        Sets `chosen_method` to the (tuple) corresponding to the chosen method string from the select widget.
+
+        Example:
+        --------
+        widget_select_method.value = ('HRSP', 'Human Health: Respiratory effects', '[kg PM2.5 eq]')
+        widget_select_method.value[0] = 'HRSP'
+        dict_db_methods = {'HRSP': [('Impact Potential', 'HRSP'), 'Human Health - Respiratory effects', '[kg PM2.5 eq]']}
+        dict_db_methods['HRSP'][0] = ('Impact Potential', 'HRSP') # which is the tuple that bd.Method needs
+        """
+        self.chosen_method = bd.Method(self.dict_db_methods[widget_select_method.value[0]][0])
+        self.chosen_method_unit = widget_select_method.value[2]
+
+
+    def set_chosen_amount(self, event):
+        """
+        Sets `chosen_amount` to the float value from the float input widget.
+        """
+        self.chosen_amount = widget_float_input_amount.value
+
+
+    def set_bool_compute_all_methods(self, event):
+        """
+        Sets `bool_compute_all_methods` to the boolean value from the checkbox widget.
+        """
+        self.bool_compute_all_methods = widget_checkbox_all_methods.value
+
+
+    def set_characterization_array(self, event):
+        """
+        Loads the characterization factors of all methods of the database once per project
+        and stacks them in an array of shape (number of methods, number of biosphere flows).
+        Rows follow the order of the method keys in `dict_db_methods`.
+
+        Example:
+        --------
+        dict_lcia_cache = {
+            'USEEIO-1.1': {
+                'methods': ['HRSP', 'OZON', ...],
+                'characterization': np.array([[0.0, 1.2, ...], [0.0, 0.0, ...], ...]),
+                'total_intensity': np.array([[0.3, 0.02, ...], [0.0, 0.1, ...], ...]),
+            }
+        }
+
+        If the dense inverse of the technosphere matrix is available (see `dense_inverse_solver_class`),
+        `total_intensity` is the array of shape (number of methods, number of products)
+        of the scores per unit of every product. Else it is `None`.
+        """
+        if bd.projects.current in self.dict_lcia_cache:
+            return
+        lca = self.dict_lca_cache[bd.projects.current]
+        method_current: tuple = lca.method
+        list_method_keys: list = list(self.dict_db_methods.keys())
+        list_characterization_vectors: list = []
+        for method_key in list_method_keys:
+            lca.switch_method(self.dict_db_methods[method_key][0])
+            list_characterization_vectors.append(lca.characterization_matrix.diagonal())
+        lca.switch_method(method_current)
+        array_characterization: np.ndarray = np.vstack(list_characterization_vectors)
+        solver = getattr(lca, 'solver', None)
+        if isinstance(solver, dense_inverse_solver_class):
+            array_total_intensity = (lca.biosphere_matrix.T @ array_characterization.T).T @ solver.inverse
+        else:
+            array_total_intensity = None
+        self.dict_lcia_cache[bd.projects.current] = {
+            'methods': list_method_keys,
+            'characterization': array_characterization,
+            'total_intensity': array_total_intensity,
+        }
+
+
+    def switch_lca_method(self, lca, method: tuple) -> None:
+        """
+        Switches the impact assessment method of a `bw2calc.LCA` object.
+        Uses the cached characterization factors (see `set_characterization_array`) if available,
+        so that no characterization matrix has to be loaded from disk.
+        """
+        dict_lcia = self.dict_lcia_cache.get(bd.projects.current)
+        if dict_lcia is not None and method[-1] in dict_lcia['methods']:
+            array_characterization = dict_lcia['characterization'][dict_lcia['methods'].index(method[-1])]
+            lca.characterization_matrix = sparse.diags(array_characterization, format='csr')
+            lca.method = method
+        else:
+            lca.switch_method(method)
+
+
+    def perform_lcia_all_methods(self, event):
+        """
+        Computes the scores of all methods of the database from the current inventory in one pass,
+        by multiplying the stacked characterization factors with the inventory vector
+        (or, if the dense inverse of the technosphere matrix is available, by a lookup of the total intensities of the demand).
+        Sets `dict_lca_scores` to a dictionary of the kind:
+
+        dict_lca_scores = {
+            'HRSP': 0.012,
+            'OZON': 0.0003,
+            ...
+        }
+        """
+        self.set_characterization_array(event)
+        dict_lcia = self.dict_lcia_cache[bd.projects.current]
+        if dict_lcia['total_intensity'] is not None:
+            array_columns = np.array([self.lca.dicts.product[node_id] for node_id in self.lca.demand], dtype=int)
+            array_scores = dict_lcia['total_intensity'][:, array_columns] @ np.array(list(self.lca.demand.values()), dtype=float)
+        else:
+            array_scores = dict_lcia['characterization'] @ (self.lca.biosphere_matrix @ self.lca.supply_array)
+        self.dict_lca_scores = dict(zip(dict_lcia['methods'], array_scores.tolist()))
+
+
+    def perform_lca(self, event):
+        """
+        Performs the LCA calculation using the chosen product, method, and amount.
+        Sets the `lca` attribute to an instance of the `bw2calc.LCA` object.
+
+        The `bw2calc.LCA` object is cached per project in `dict_lca_cache`,
+        as a shallow copy of a process-wide shared object (see `create_factorized_lca`),
+        so that the technosphere matrix is only loaded and factorized once for all sessions:
+
+        - a new amount of the same product only rescales the supply vector and inventory,
+        - a new method only reloads the characterization matrix,
+        - a new product is solved with the already factorized technosphere matrix.
+        """
+        demand: dict = {self.chosen_activity_id: self.chosen_amount}
+        lca = self.dict_lca_cache.get(bd.projects.current)
+
+        if lca is None:
+            lca = copy.copy(get_shared_cache(
+                ('lca', bd.projects.current),
+                create_factorized_lca, demand, self.chosen_method.name
+            ))
+            self.dict_lca_cache[bd.projects.current] = lca
+            if lca.method != self.chosen_method.name:
+                self.switch_lca_method(lca, self.chosen_method.name)
+            lca.lci(demand=demand)
+            lca.lcia_calculation()
+        else:
+            if lca.method != self.chosen_method.name:
+                self.switch_lca_method(lca, self.chosen_method.name)
+            previous_amount: float = lca.demand.get(self.chosen_activity_id, 0)
+            if lca.demand.keys() == demand.keys() and previous_amount != 0:
+                scaling_factor: float = self.chosen_amount / previous_amount
+                lca.supply_array = lca.supply_array * scaling_factor
+                lca.inventory = lca.inventory * scaling_factor
+                lca.demand = demand
+                lca.build_demand_array(demand) # graph traversal overwrites the demand array
+            else:
+                lca.lci(demand=demand)
+            lca.lcia_calculation()
+
+        self.lca = lca
+        if self.bool_compute_all_methods:
+            self.perform_lcia_all_methods(event)
+        else:
+            self.dict_lca_scores = {}
+
+
+    def perform_sensitivity_analysis(self, event):
+        """
+        Computes the sensitivity of the LCA score to every exchange of the technosphere matrix
+        with one transposed solve (see `compute_exchange_sensitivities`),
+        and sets `df_sensitivity_ranking` to the exchanges with the largest sensitivity (see `create_sensitivity_ranking`).
+        """
+        self.dict_sensitivity = compute_exchange_sensitivities(
+            lca=self.lca,
+            demand={self.chosen_activity_id: self.chosen_amount},
+        )
+        self.df_sensitivity_ranking = create_sensitivity_ranking(
+            lca=self.lca,
+            dict_sensitivity=self.dict_sensitivity,
+            int_top_exchanges=self.int_sensitivity_top_exchanges,
+        )
+
+
+    def iterate_monte_carlo(self, event, dict_monte_carlo: dict):
+        """
+        Runs up to `int_monte_carlo_iterations` Monte Carlo iterations of the chosen product, amount and method
+        (see `montecarlo_worker.iterate_monte_carlo_batches`), updates the result dictionary of this run after every batch
+        and then yields, so that the caller can show the progress:
+
+        dict_monte_carlo = {
+            'seed': 1234,
+            'iterations': 1000,
+            'samples': np.array([[504.1, 299.6, 4.8, 199.7], ...]), # score, scope 1, scope 2, scope 3
+            'statistics': pd.DataFrame(...), # see `compute_monte_carlo_statistics`
+            'converged': False,
+        }
 
-        self.dict_db_methods = dict_methods_enriched
-        self.list_db_methods = list_methods_for_autocomplete
+        The iterations run in `int_monte_carlo_processes` worker processes (see `iterate_monte_carlo_batches_in_processes`).
+        In Pyodide, they run one batch after the other (see `button_action_monte_carlo`).
 
+        The simulation stops early once the 95% interval of the score is stable:
+        after at least `int_monte_carlo_min_iterations` iterations, if its bounds changed by less than
+        `float_monte_carlo_tolerance` (relative to the median) over the last three batches.
+        It also stops if a new calculation is started (see `start_new_calculation`).
 
-    def set_chosen_activity(self, event):
+        Every run fills its own result dictionary, which is only then set as `dict_monte_carlo`,
+        so that the results of a run are never reset or mixed up by the user interface or by another run.
+
+        Parameters
+        ----------
+        dict_monte_carlo : dict
+            Empty result dictionary of this run, which can be read by the user interface while the run is ongoing.
+        """
+        calculation_id: int = self.int_calculation_id
+        demand: dict = {self.chosen_activity_id: self.chosen_amount}
+        _, data_objs, _ = bd.prepare_lca_inputs(demand=demand, method=self.chosen_method.name, remapping=False)
+        seed: int = int(np.random.default_rng().integers(2**31 - 2**16))
+        dict_monte_carlo.update({
+            'seed': seed,
+            'iterations': self.int_monte_carlo_iterations,
+            'samples': np.empty((0, 4)),
+            'statistics': None,
+            'converged': False,
+        })
+        self.dict_monte_carlo = dict_monte_carlo
+        dict_arguments: dict = {
+            'demand': demand,
+            'activity_id': get_production_activity_id(self.lca, self.chosen_activity_id),
+            'data_objs': data_objs,
+            'scope_2_activity_ids': self.array_scope_2_activity_ids,
+            'dense_max_products': int_dense_inverse_max_products,
+            'batch_size': self.int_monte_carlo_batch_size,
+        }
+        if self.int_monte_carlo_processes > 1 and sys.platform != 'emscripten':
+            batches = iterate_monte_carlo_batches_in_processes(
+                int_processes=self.int_monte_carlo_processes,
+                iterations=self.int_monte_carlo_iterations,
+                seed=seed,
+                **dict_arguments
+            )
+        else:
+            batches = montecarlo_worker.iterate_monte_carlo_batches(iterations=self.int_monte_carlo_iterations, seed=seed, **dict_arguments)
+
+        list_bounds: list = []
+        try:
+            for batch in batches:
+                samples: np.ndarray = np.vstack([dict_monte_carlo['samples'], batch])
+                df_statistics: pd.DataFrame = compute_monte_carlo_statistics(samples)
+                dict_monte_carlo.update(samples=samples, statistics=df_statistics)
+                list_bounds.append(df_statistics.loc[0, ['2.5%', '97.5%']].to_numpy(dtype=float))
+                if (
+                    len(samples) >= self.int_monte_carlo_min_iterations and
+                    len(list_bounds) > 3 and
+                    np.all(
+                        np.abs(np.diff(list_bounds[-4:], axis=0)) <=
+                        self.float_monte_carlo_tolerance * abs(df_statistics.loc[0, '50%'])
+                    )
+                ):
+                    dict_monte_carlo['converged'] = True
+                    break
+                if calculation_id != self.int_calculation_id:
+                    break
+                yield
+        finally:
+            batches.close()
+
+
+    def perform_monte_carlo(self, event, dict_monte_carlo: dict):
         """
-        Sets `chosen_activity` to the `bw2data.backends.proxies.Activity` object of the chosen product from the autocomplete widget.
+        Runs the Monte Carlo simulation (see `iterate_monte_carlo`) until it is completed.
         """
-        self.chosen_activity: Activity = bd.utils.get_node(
-            database = self.db_name,
-            name = widget_autocomplete_product.value,
-            type = 'product',
-            location = 'United States'
-        )
+        for _ in self.iterate_monte_carlo(event, dict_monte_carlo):
+            pass
 
 
-    def set_chosen_method_and_unit(self, event):
+    def set_portfolio(self, df_portfolio: pd.DataFrame) -> None:
         """
-        Sets `chosen_method` to the (tuple) corresponding to the chosen method string from the select widget.
+        Sets `df_portfolio` to the portfolio with products resolved to node ids (see `read_portfolio_csv`).
+        Products are matched by node id, by label of the product search, or by name (first product of that name).
+        Rows with the same product are summed.
 
         Example:
         --------
-        widget_select_method.value = ('HRSP', 'Human Health: Respiratory effects', '[kg PM2.5 eq]')
-        widget_select_method.value[0] = 'HRSP'
-        dict_db_methods = {'HRSP': [('Impact Potential', 'HRSP'), 'Human Health - Respiratory effects', '[kg PM2.5 eq]']}
-        dict_db_methods['HRSP'][0] = ('Impact Potential', 'HRSP') # which is the tuple that bd.Method needs
+        df_portfolio = pd.DataFrame({
+            'activity_datapackage_id': [2, 15],
+            'Product': ['Grains; at farm', 'Electricity'],
+            'Amount': [1200, 350.5],
+        })
+
+        Raises
+        ------
+        ValueError
+            If the portfolio has no products, if products cannot be found in the database, or if amounts are not numbers.
         """
-        self.chosen_method = bd.Method(self.dict_db_methods[widget_select_method.value[0]][0])
-        self.chosen_method_unit = widget_select_method.value[2]
+        if df_portfolio.empty:
+            raise ValueError('The portfolio does not contain any products.')
+        dict_labels_to_ids: dict = self.product_catalogue['dict_labels_to_ids']
+        dict_names_to_ids: dict = dict(zip(reversed(self.product_catalogue['names']), reversed(self.product_catalogue['ids'])))
+        set_ids: set = set(self.product_catalogue['ids'])
+
+        list_ids: list = []
+        list_unknown: list = []
+        for product in df_portfolio['product'].astype(str).str.strip():
+            if product in dict_labels_to_ids:
+                list_ids.append(dict_labels_to_ids[product])
+            elif product in dict_names_to_ids:
+                list_ids.append(dict_names_to_ids[product])
+            elif product.isdigit() and int(product) in set_ids:
+                list_ids.append(int(product))
+            else:
+                list_unknown.append(product)
+        if list_unknown:
+            raise ValueError(f'Products not found in the database: {", ".join(list_unknown[:10])}')
+        array_amounts = pd.to_numeric(df_portfolio['amount'], errors='coerce').to_numpy(dtype=float)
+        if np.isnan(array_amounts).any():
+            raise ValueError('All amounts of the portfolio must be numbers.')
+
+        df = pd.DataFrame({'activity_datapackage_id': list_ids, 'Amount': array_amounts})
+        df = df.groupby('activity_datapackage_id', as_index=False, sort=False)['Amount'].sum()
+        df.insert(1, 'Product', df['activity_datapackage_id'].map(self.product_catalogue['dict_ids_to_names']))
+        self.df_portfolio = df
+
+
+    def perform_portfolio_lca(self, event):
+        """
+        Computes the scores of all products of the portfolio (`df_portfolio`) for all methods of the database
+        and sets `df_portfolio_scores`.
 
+        All demands are solved in one batch, as columns of a single right-hand side matrix,
+        against the factorized technosphere matrix (see `solve_technosphere`).
+        The inventories of all products are then characterized for all methods with one matrix product
+        (see `set_characterization_array`), so that hundreds of products cost about as much as a few.
+        If the dense inverse of the technosphere matrix is available, the scores are looked up
+        in the total intensities of the products instead.
 
-    def set_chosen_amount(self, event):
+        Example:
+        --------
+        | Product         | Amount | GCC [kg CO2 eq] | ACID [kg SO2 eq] | ... |
+        |-----------------|--------|-----------------|------------------|-----|
+        | Grains; at farm | 1200   | 1051.2          | 2.1              | ... |
+        | Electricity     | 350.5  | 1530.3          | 4.6              | ... |
+        | Total           | 1550.5 | 2581.5          | 6.7              | ... |
         """
-        Sets `chosen_amount` to the float value from the float input widget.
+        df: pd.DataFrame = self.df_portfolio
+        lca = self.dict_lca_cache.get(bd.projects.current)
+        if lca is None:
+            lca = copy.copy(get_shared_cache(
+                ('lca', bd.projects.current),
+                create_factorized_lca,
+                {int(df['activity_datapackage_id'].iloc[0]): 1},
+                next(iter(self.dict_db_methods.values()))[0]
+            ))
+            self.dict_lca_cache[bd.projects.current] = lca
+        self.set_characterization_array(event)
+        dict_lcia: dict = self.dict_lcia_cache[bd.projects.current]
+
+        array_rows = np.array([lca.dicts.product[node_id] for node_id in df['activity_datapackage_id']], dtype=int)
+        array_amounts: np.ndarray = df['Amount'].to_numpy(dtype=float)
+        if dict_lcia['total_intensity'] is not None:
+            array_scores: np.ndarray = dict_lcia['total_intensity'][:, array_rows] * array_amounts
+        else:
+            demand_matrix = np.zeros((len(lca.dicts.product), len(df)))
+            demand_matrix[array_rows, np.arange(len(df))] = array_amounts
+            supply_matrix: np.ndarray = solve_technosphere(lca, demand_matrix)
+            array_scores: np.ndarray = dict_lcia['characterization'] @ (lca.biosphere_matrix @ supply_matrix)
+
+        df_scores = df[['Product', 'Amount']].copy()
+        for method_key, scores in zip(dict_lcia['methods'], array_scores):
+            df_scores[f'{method_key} {self.dict_db_methods[method_key][2]}'] = scores
+        df_scores.loc[len(df_scores)] = ['Total'] + df_scores.iloc[:, 1:].sum().tolist()
+        self.df_portfolio_scores = df_scores
+
+
+    def get_portfolio_scores(self, df_portfolio: pd.DataFrame) -> pd.DataFrame:
         """
-        self.chosen_amount = widget_float_input_amount.value
+        Returns the scores of all products of a portfolio for all methods of the database
+        (Python interface of the portfolio mode, see `set_portfolio` and `perform_portfolio_lca`).
+        The database must have been loaded (see `button_action_load_database`).
+
+        Example:
+        --------
+        >>> panel_lca_class_instance.get_portfolio_scores(
+        ...     pd.DataFrame({'product': ['Grains; at farm', 'Electricity'], 'amount': [1200, 350.5]})
+        ... )
+        """
+        self.set_portfolio(df_portfolio)
+        self.perform_portfolio_lca(None)
+        return self.df_portfolio_scores
 
 
-    def perform_lca(self, event):
+    def start_new_calculation(self) -> int:
         """
-        Performs the LCA calculation using the chosen product, method, and amount.
-        Sets the `lca` attribute to an instance of the `bw2calc.LCA` object.
+        Starts a new calculation and returns its id.
+        Any calculation started before is superseded, and is cancelled at its next stage
+        (see `run_calculation_stage`).
         """
-        self.lca = bc.LCA( 
-            demand={self.chosen_activity: self.chosen_amount}, 
-            method = self.chosen_method.name
-        )
-        self.lca.lci()
-        self.lca.lcia()
+        self.int_calculation_id += 1
+        return self.int_calculation_id
 
 
     def set_graph_traversal_cutoff(self, event):
@@ -753,11 +2528,128 @@ class panel_lca_class:
         self.graph_traversal_cutoff = widget_float_slider_cutoff.value / 100
 
 
+    def get_graph_traversal_cache_key(self) -> tuple:
+        """
+        Returns the key of the current graph traversal in `dict_graph_traversal_cache`.
+        The amount is not part of the key, since traversal results scale linearly with the amount.
+        """
+        return (
+            bd.projects.current,
+            self.chosen_activity_id,
+            self.chosen_method.name,
+            self.graph_traversal_cutoff,
+        )
+
+
+    def load_graph_traversal_from_cache(self, key: tuple) -> bool:
+        """
+        Sets the graph traversal dataframes from `dict_graph_traversal_cache`, if the key is cached.
+        Supply amounts and direct burdens are rescaled linearly to the chosen amount.
+        Traversals of a zero amount cannot be rescaled and are never used.
+
+        Returns
+        -------
+        bool
+            True if the graph traversal was loaded from the cache, False otherwise.
+        """
+        dict_cached: dict = self.dict_graph_traversal_cache.get(key)
+        if dict_cached is None or dict_cached['amount'] == 0:
+            return False
+        self.dict_graph_traversal_cache.move_to_end(key)
+
+        scaling_factor: float = self.chosen_amount / dict_cached['amount']
+        list_scaled_dataframes: list = []
+        for df in (dict_cached['nodes'], dict_cached['tabulator']):
+            df = df.copy()
+            df['SupplyAmount'] = df['SupplyAmount'] * scaling_factor
+            df['Burden(Direct)'] = df['Burden(Direct)'] * scaling_factor
+            list_scaled_dataframes.append(df)
+        self.df_graph_traversal_nodes, self.df_tabulator_from_traversal = list_scaled_dataframes
+        self.df_graph_traversal_edges = dict_cached['edges']
+        self.dict_traversal_tree = dict_cached['tree']
+        self.graph_traversal = {}
+        return True
+
+
+    def store_graph_traversal_in_cache(self, key: tuple) -> None:
+        """
+        Stores the current graph traversal dataframes in `dict_graph_traversal_cache`.
+        Least recently used entries are evicted until the cache is smaller than
+        `int_graph_traversal_cache_max_bytes` (the most recent entry is always kept).
+        Traversals of a zero amount are not stored, since they cannot be rescaled to other amounts.
+        """
+        if self.chosen_amount == 0:
+            return
+        dict_cached: dict = {
+            'amount': self.chosen_amount,
+            'nodes': self.df_graph_traversal_nodes,
+            'edges': self.df_graph_traversal_edges,
+            'tabulator': self.df_tabulator_from_traversal,
+            'tree': self.dict_traversal_tree,
+        }
+        dict_cached['bytes'] = sum(
+            int(dict_cached[name].memory_usage(deep=True).sum())
+            for name in ('nodes', 'edges', 'tabulator')
+        ) + sum(array.nbytes for array in self.dict_traversal_tree.values())
+        self.dict_graph_traversal_cache[key] = dict_cached
+        self.dict_graph_traversal_cache.move_to_end(key)
+        while (
+            len(self.dict_graph_traversal_cache) > 1 and
+            sum(value['bytes'] for value in self.dict_graph_traversal_cache.values()) > self.int_graph_traversal_cache_max_bytes
+        ):
+            self.dict_graph_traversal_cache.popitem(last=False)
+
+
+    def perform_resumable_graph_traversal(self, event) -> dict:
+        """
+        Returns the graph traversal at the current cutoff in columnar form (see `create_graph_traversal_arrays`),
+        re-using the resumable graph traversal state (see `resumable_graph_traversal_class`)
+        of the same reference product and method:
+
+        - if the cutoff is lower than before, only the previously pruned edges are expanded,
+        - if the cutoff is higher than before, the existing result is filtered.
+
+        The state is kept at the amount it was computed with (`graph_traversal_state_amount`),
+        and is computed again if that amount is zero, since it then cannot be rescaled.
+        """
+        key: tuple = self.get_graph_traversal_cache_key()[:-1]
+        if self.graph_traversal_state_key != key or self.graph_traversal_state_amount == 0:
+            self.graph_traversal_state = get_resumable_graph_traversal_class()(
+                self.lca,
+                bgt.GraphTraversalSettings(cutoff=self.graph_traversal_cutoff)
+            )
+            self.graph_traversal_state.traverse()
+            self.graph_traversal_state_key = key
+            self.graph_traversal_state_amount = self.chosen_amount
+        elif self.graph_traversal_cutoff < self.graph_traversal_state.settings.cutoff:
+            self.graph_traversal_state.resume(cutoff=self.graph_traversal_cutoff)
+        return self.graph_traversal_state.get_traversal_arrays(cutoff=self.graph_traversal_cutoff)
+
+
     def perform_graph_traversal(self, event):
-        widget_cutoff_indicator_statictext.value = self.graph_traversal_cutoff * 100
-        self.graph_traversal: dict = bgt.NewNodeEachVisitGraphTraversal.calculate(self.lca, cutoff=self.graph_traversal_cutoff)
-        self.df_graph_traversal_nodes: pd.DataFrame = nodes_dict_to_dataframe(self.graph_traversal['nodes'])
-        self.df_graph_traversal_edges: pd.DataFrame = edges_dict_to_dataframe(self.graph_traversal['edges'])
+        """
+        Performs the graph traversal and sets the nodes, edges and tabulator dataframes.
+
+        Finished traversals are kept in an LRU cache keyed by
+        (project, reference product, method, cutoff), see `store_graph_traversal_in_cache`.
+        The table has a column 'Sensitivity' with the sensitivity of the LCA score to the edge of every node
+        (see `get_traversal_sensitivities`), which does not depend on the amount.
+        A cached traversal is reused (and rescaled) for any amount of the same reference product.
+        Otherwise, the resumable graph traversal state is refined or filtered to the new cutoff
+        (see `perform_resumable_graph_traversal`).
+        """
+        key: tuple = self.get_graph_traversal_cache_key()
+        if self.load_graph_traversal_from_cache(key):
+            return
+        self.graph_traversal: dict = self.perform_resumable_graph_traversal(event)
+        scaling_factor: float = self.chosen_amount / self.graph_traversal_state_amount
+        for name in ('supply', 'direct', 'direct_outside_flows', 'cumulative'):
+            self.graph_traversal[name] *= scaling_factor
+        self.df_graph_traversal_nodes: pd.DataFrame = nodes_dict_to_dataframe(
+            traversal=self.graph_traversal,
+            scope_2_activity_ids=self.array_scope_2_activity_ids
+        )
+        self.df_graph_traversal_edges: pd.DataFrame = edges_dict_to_dataframe(self.graph_traversal)
         if self.df_graph_traversal_edges.empty:
             return
         else:
@@ -768,10 +2660,108 @@ class panel_lca_class:
                 left_on='UID',
                 right_on='producer_unique_id',
                 how='left')
+            self.dict_traversal_tree = build_traversal_tree(self.df_tabulator_from_traversal, self.graph_traversal)
+            if (
+                self.dict_sensitivity.get('method') != self.lca.method or
+                self.dict_sensitivity.get('demand', {}).keys() != {self.chosen_activity_id}
+            ):
+                self.perform_sensitivity_analysis(event)
+            self.df_tabulator_from_traversal.insert(
+                self.df_tabulator_from_traversal.columns.get_loc('Burden(Direct)') + 1,
+                'Sensitivity',
+                get_traversal_sensitivities(
+                    lca=self.lca,
+                    tree=self.dict_traversal_tree,
+                    df=self.df_tabulator_from_traversal,
+                    dict_sensitivity=self.dict_sensitivity,
+                )
+            )
+            self.store_graph_traversal_in_cache(key)
+
+
+    def add_tabulator_edit(self, event):
+        """
+        Appends a cell edit of the tabulator widget to `list_tabulator_edits`,
+        as (unique_id, column, old value, new value).
+
+        See Also
+        --------
+        - https://panel.holoviz.org/reference/widgets/Tabulator.html#editors-editing
+        """
+        uid: int = int(widget_tabulator.value['UID'].iloc[event.row])
+        self.list_tabulator_edits.append((uid, event.column, event.old, event.value))
+
+
+    def update_data_based_on_user_input(self, event):
+        """
+        Updates supply amounts, burden intensities and burdens of the tabulator dataframe
+        based on the cell edits of the user since the last update (`list_tabulator_edits`),
+        and sets `float_lca_score_user_input` to the exact LCA score with the user edits of all rounds.
+
+        The graph traversal result (`df_tabulator_from_traversal`) is never modified.
+        Every round of edits is applied on top of the current table and of the coefficient changes
+        of the previous rounds (`dict_coefficient_changes`), so that only the changes of its own edits are propagated
+        (see `update_traversal_based_on_coefficient_changes`). User-supplied values accumulate in `dict_user_overrides`,
+        which marks the edited rows. An override is removed if the user restores the original value.
+        If the edits make the technosphere matrix singular, `np.linalg.LinAlgError` is raised
+        (or `ValueError` if an edit cannot be translated, see `get_coefficient_changes_from_user_edits`)
+        and neither the coefficient changes, the overrides nor the dataframe are changed.
+
+        The edits are translated into changes of the technosphere coefficients, demand and burden intensities
+        of the LCA model (see `get_coefficient_changes_from_user_edits`), so that shared suppliers
+        are updated on all branches of the table.
+        The exact score is solved with a low-rank update of the factorized technosphere matrix,
+        without refactorizing it (see `solve_technosphere_with_updates`). The solves of previous rounds
+        are kept in `dict_technosphere_solves`, so that only the newly changed rows of the matrix are solved.
+        """
+        df: pd.DataFrame = self.df_tabulator.copy()
+        dict_overrides: dict = copy.deepcopy(self.dict_user_overrides)
+        dict_edits: dict = {}
+        set_restored_cells: set = set()
+        for uid, column, old, new in self.list_tabulator_edits:
+            if column not in ('SupplyAmount', 'BurdenIntensity'):
+                continue
+            row: int = self.dict_traversal_tree['row'][uid]
+            if (uid, column) not in set_restored_cells:
+                # the tabulator widget has already written the edit to the dataframe
+                df.iloc[row, df.columns.get_loc(column)] = old
+                set_restored_cells.add((uid, column))
+            dict_edits.setdefault(uid, {})[column] = new
+            if new == self.df_tabulator_from_traversal[column].iloc[row]:
+                dict_overrides.get(uid, {}).pop(column, None)
+                if dict_overrides.get(uid) == {}:
+                    del dict_overrides[uid]
+            else:
+                dict_overrides.setdefault(uid, {})[column] = new
+        dict_changes: dict = get_coefficient_changes_from_user_edits(
+            df=df,
+            tree=self.dict_traversal_tree,
+            dict_edits=dict_edits,
+            lca=self.lca,
+            dict_changes=self.dict_coefficient_changes,
+        )
+        self.float_lca_score_user_input = compute_lca_score_with_coefficient_changes(
+            lca=self.lca,
+            demand={self.chosen_activity_id: self.chosen_amount},
+            dict_changes=dict_changes,
+            dict_solves=self.dict_technosphere_solves,
+        )
+        self.df_tabulator = update_traversal_based_on_coefficient_changes(
+            df=df,
+            tree=self.dict_traversal_tree,
+            dict_changes=dict_changes,
+            dict_overrides=dict_overrides,
+            lca=self.lca,
+            dict_changes_previous=self.dict_coefficient_changes,
+        )
+        self.dict_coefficient_changes = dict_changes
+        self.dict_user_overrides = dict_overrides
+        self.list_tabulator_edits = []
 
 
 brightway_wasm_database_storage_workaround()
 panel_lca_class_instance = panel_lca_class()
+pn.state.onload(preload_modules)
 
 # COLUMN 1 ####################################################################
 
@@ -779,37 +2769,150 @@ def button_action_load_database(event):
     panel_lca_class_instance.set_db(event)
     panel_lca_class_instance.set_list_db_products(event)
     panel_lca_class_instance.set_methods_objects(event)
-    widget_autocomplete_product.options = panel_lca_class_instance.list_db_products
+    if len(panel_lca_class_instance.list_db_products) <= panel_lca_class_instance.int_autocomplete_max_options:
+        widget_autocomplete_product.options = panel_lca_class_instance.get_dict_db_products()
+    else:
+        widget_autocomplete_product.options = []
     widget_select_method.options = panel_lca_class_instance.list_db_methods
     widget_select_method.value = [item for item in panel_lca_class_instance.list_db_methods if 'GCC' in item[0]][0] # global warming as default value
 
 
-def button_action_perform_lca(event):
-    if widget_autocomplete_product.value == '':
+async def run_calculation_stage(calculation_id: int | None, function, *args) -> bool:
+    """
+    Runs one stage of a calculation pipeline (e.g. `panel_lca_class.perform_lca`) off the event loop,
+    so that the user interface (and, under `panel serve`, all other sessions) do not freeze.
+
+    Stages of one session run one after the other. A stage is skipped
+    if its calculation has been superseded by a newer one (see `panel_lca_class.start_new_calculation`)
+    while waiting. Threads cannot be interrupted, so a stage which is already running finishes first.
+    Calculations which do not depend on the chosen product (e.g. `panel_lca_class.perform_portfolio_lca`)
+    pass `None` as calculation id: they wait for the running stage, but are never superseded.
+
+    Notes
+    -----
+    Stages run on the process-wide thread pool `calculation_executor`. A process pool is not used,
+    since the calculation state (`bw2calc.LCA` objects, factorized matrices) cannot be cheaply sent to other processes.
+    Only the Monte Carlo simulation, whose iterations are independent, runs in worker processes of its own
+    (see `iterate_monte_carlo_batches_in_processes`).
+    In Pyodide, where threads are not available, stages run directly
+    (the Pyodide worker already runs off the browser main thread).
+
+    Returns
+    -------
+    bool
+        True if the calculation is still current after the stage, False if it has been superseded.
+    """
+    async with panel_lca_class_instance.calculation_lock:
+        if calculation_id not in (None, panel_lca_class_instance.int_calculation_id):
+            return False
+        if sys.platform == 'emscripten':
+            function(*args)
+        else:
+            await asyncio.get_running_loop().run_in_executor(calculation_executor, function, *args)
+    return calculation_id in (None, panel_lca_class_instance.int_calculation_id)
+
+
+async def set_calculation_inputs(calculation_id: int, event, *setters) -> bool:
+    """
+    Runs the setters of the calculation inputs (e.g. `panel_lca_class.set_chosen_amount`) between two stages
+    (see `run_calculation_stage`).
+
+    The inputs are attributes of `panel_lca_class_instance`, which are read by all stages.
+    A stage of a superseded calculation which is still running (e.g. `panel_lca_class.perform_graph_traversal`,
+    which stores its results in the cache under `chosen_amount`) must not see the inputs of the new calculation.
+
+    Returns
+    -------
+    bool
+        True if the inputs were set, False if the calculation has been superseded.
+    """
+    async with panel_lca_class_instance.calculation_lock:
+        if calculation_id != panel_lca_class_instance.int_calculation_id:
+            return False
+        for setter in setters:
+            setter(event)
+    return True
+
+
+async def button_action_perform_lca(event):
+    if widget_autocomplete_product.value in ('', None):
         pn.state.notifications.error('Please select a reference product first!', duration=5000)
         return
     else:
+        calculation_id: int = panel_lca_class_instance.start_new_calculation()
         panel_lca_class_instance.df_graph_traversal_nodes = pd.DataFrame()
         widget_plotly_figure_piechart.object = create_plotly_figure_piechart({'null':0})
         pn.state.notifications.info('Calculating LCA score...', duration=5000)
         pass
-    panel_lca_class_instance.set_chosen_activity(event)
-    panel_lca_class_instance.set_chosen_method_and_unit(event)
-    panel_lca_class_instance.set_chosen_amount(event)
-    panel_lca_class_instance.perform_lca(event)
+    if not await set_calculation_inputs(
+        calculation_id,
+        event,
+        panel_lca_class_instance.set_chosen_activity,
+        panel_lca_class_instance.set_chosen_method_and_unit,
+        panel_lca_class_instance.set_chosen_amount,
+        panel_lca_class_instance.set_bool_compute_all_methods,
+    ):
+        return
+    if not await run_calculation_stage(calculation_id, panel_lca_class_instance.perform_lca, event):
+        return
     pn.state.notifications.success('Completed LCA score calculation!', duration=5000)
     widget_number_lca_score.format = f'{{value:,.3f}} {panel_lca_class_instance.chosen_method_unit}'
-    perform_graph_traversal(event)
+    if not await run_calculation_stage(calculation_id, panel_lca_class_instance.perform_sensitivity_analysis, event):
+        return
+    widget_tabulator_sensitivity.value = panel_lca_class_instance.df_sensitivity_ranking
+    if not await perform_graph_traversal(event, calculation_id):
+        return
     perform_scope_analysis(event)
 
 
-def perform_graph_traversal(event):
+def select_action_method(event):
+    """
+    Shows the score of the newly selected method without recalculation,
+    if the scores of all methods have already been computed (see `panel_lca_class.perform_lcia_all_methods`).
+
+    The calculation itself (`chosen_method`, `lca`) is not changed, so that the table of upstream processes,
+    the scope analysis, the table edits and the download filename stay consistent with each other
+    until the next calculation (see `button_action_perform_lca`).
+    """
+    if event.new is None or event.new[0] not in panel_lca_class_instance.dict_lca_scores:
+        return
+    widget_number_lca_score.format = f'{{value:,.3f}} {event.new[2]}'
+    widget_number_lca_score.value = panel_lca_class_instance.dict_lca_scores[event.new[0]]
+    pn.state.notifications.info('Showing the total LCA score. Press "Compute LCA Score" to update the table of upstream processes.', duration=5000)
+
+
+def set_tabulator_value(df: pd.DataFrame) -> None:
+    """
+    Shows a dataframe in the tabulator widget.
+
+    Tables with more than `int_tabulator_max_local_rows` rows use remote pagination:
+    sorting and header filtering are done on the server and only the visible page is sent to the browser.
+    Smaller tables are sent to the browser in full, so that scrolling, sorting and filtering do not need round-trips.
+
+    See Also
+    --------
+    - https://panel.holoviz.org/reference/widgets/Tabulator.html#pagination
+    """
+    if len(df) > panel_lca_class_instance.int_tabulator_max_local_rows:
+        widget_tabulator.param.update(pagination='remote', page=1, header_filters=True, value=df)
+    else:
+        widget_tabulator.param.update(pagination=None, header_filters=False, value=df)
+
+
+async def perform_graph_traversal(event, calculation_id: int) -> bool:
     pn.state.notifications.info('Performing Graph Traversal...', duration=5000)
-    panel_lca_class_instance.bool_user_provided_data = False
-    panel_lca_class_instance.set_graph_traversal_cutoff(event)
-    panel_lca_class_instance.perform_graph_traversal(event)
+    if not await set_calculation_inputs(calculation_id, event, panel_lca_class_instance.set_graph_traversal_cutoff):
+        return False
+    widget_cutoff_indicator_statictext.value = panel_lca_class_instance.graph_traversal_cutoff * 100
+    if not await run_calculation_stage(calculation_id, panel_lca_class_instance.perform_graph_traversal, event):
+        return False
+    panel_lca_class_instance.list_tabulator_edits = []
+    panel_lca_class_instance.dict_user_overrides = {}
+    panel_lca_class_instance.dict_coefficient_changes = None
+    panel_lca_class_instance.dict_technosphere_solves = {}
+    panel_lca_class_instance.float_lca_score_user_input = None
     panel_lca_class_instance.df_tabulator = panel_lca_class_instance.df_tabulator_from_traversal.copy()
-    widget_tabulator.value = panel_lca_class_instance.df_tabulator
+    set_tabulator_value(panel_lca_class_instance.df_tabulator)
     column_editors = {
         colname: None
         for colname in panel_lca_class_instance.df_tabulator.columns
@@ -818,66 +2921,181 @@ def perform_graph_traversal(event):
     column_editors['Scope'] = {'type': 'list', 'values': [1, 2, 3]}
     widget_tabulator.editors = column_editors
     pn.state.notifications.success('Graph Traversal Complete!', duration=5000)
-
+    return True
 
 
 def perform_scope_analysis(event):
     pn.state.notifications.info('Performing Scope Analysis...', duration=5000)
-    panel_lca_class_instance.scope_dict = determine_scope_emissions(df=widget_tabulator.value)
+    panel_lca_class_instance.dict_scope_breakdown = determine_scope_emissions(df=widget_tabulator.value)
+    panel_lca_class_instance.scope_dict = panel_lca_class_instance.dict_scope_breakdown['Scope']
     widget_plotly_figure_piechart.object = create_plotly_figure_piechart(panel_lca_class_instance.scope_dict)
+    update_scope_breakdown_view(event)
     filename_download.value = generate_table_filename()
-    widget_number_lca_score.value = panel_lca_class_instance.df_tabulator['Burden(Direct)'].sum()
+    widget_number_lca_score.format = f'{{value:,.3f}} {panel_lca_class_instance.chosen_method_unit}'
+    widget_number_lca_score.value = sum(panel_lca_class_instance.scope_dict.values())
     pn.state.notifications.success('Scope Analysis Complete!', duration=5000)
 
 
-def update_data_based_on_user_input(event):
+def update_scope_breakdown_view(event):
+    """
+    Shows the breakdown of the scope analysis (see `determine_scope_emissions`)
+    by contributing activity or by depth, for all scopes or for the scope selected in the pie chart.
+    Only the stored breakdown is used, the table of upstream processes is not scanned again.
+    """
+    dict_scope_breakdown: dict = panel_lca_class_instance.dict_scope_breakdown
+    if not dict_scope_breakdown:
+        return
+    str_scope: str = widget_select_breakdown_scope.value
+    if widget_radio_breakdown.value == 'Activities':
+        df = dict_scope_breakdown['Activities']
+        if str_scope != 'All':
+            df = df.loc[df['Scope'] == int(str_scope[-1])]
+    else:
+        df = dict_scope_breakdown['Depth'].reset_index()
+        if str_scope != 'All':
+            df = df[['Depth', str_scope]]
+    widget_tabulator_breakdown.value = df
+
+
+def plotly_action_select_scope(event):
+    """
+    Drills down to the scope of the pie chart segment clicked by the user.
+    """
+    if event.new and event.new.get('points'):
+        label = event.new['points'][0].get('label')
+        if label in widget_select_breakdown_scope.options:
+            widget_select_breakdown_scope.value = label
+
+
+async def update_data_based_on_user_input(event, calculation_id: int) -> bool:
     pn.state.notifications.info('Updating Supply Chain based on User Input...', duration=5000)
-    panel_lca_class_instance.df_tabulator_from_user = create_user_input_columns(
-        df_original=panel_lca_class_instance.df_tabulator_from_traversal,
-        df_user_input=panel_lca_class_instance.df_tabulator_from_user,
-    )
-    panel_lca_class_instance.df_tabulator_from_user = determine_edited_rows(df=panel_lca_class_instance.df_tabulator_from_user)
-    panel_lca_class_instance.df_tabulator_from_user = update_production_based_on_user_data(df=panel_lca_class_instance.df_tabulator_from_user)
-    panel_lca_class_instance.df_tabulator_from_user = update_burden_intensity_based_on_user_data(df=panel_lca_class_instance.df_tabulator_from_user)
-    panel_lca_class_instance.df_tabulator_from_user = update_burden_based_on_user_data(panel_lca_class_instance.df_tabulator_from_user)
-    panel_lca_class_instance.df_tabulator = panel_lca_class_instance.df_tabulator_from_user.copy()
-    widget_tabulator.value = panel_lca_class_instance.df_tabulator
+    try:
+        if not await run_calculation_stage(calculation_id, panel_lca_class_instance.update_data_based_on_user_input, event):
+            return False
+    except np.linalg.LinAlgError:
+        pn.state.notifications.error('The edited supply chain cannot be solved (singular technosphere matrix). Please revise your edits!', duration=10000)
+        return False
+    except ValueError as error:
+        pn.state.notifications.error(f'{error} Please revise your edits!', duration=10000)
+        return False
+    set_tabulator_value(panel_lca_class_instance.df_tabulator)
     pn.state.notifications.success('Completed Updating Supply Chain based on User Input!', duration=5000)
+    pn.state.notifications.info(
+        f'Total LCA score with your edits (including processes below the cutoff): '
+        f'{panel_lca_class_instance.float_lca_score_user_input:,.3f} {panel_lca_class_instance.chosen_method_unit}',
+        duration=0
+    )
+    return True
 
-def button_action_scope_analysis(event):
+
+async def button_action_scope_analysis(event):
     if panel_lca_class_instance.lca is None:
         pn.state.notifications.error('Please perform an LCA Calculation first!', duration=5000)
         return
     else:
+        calculation_id: int = panel_lca_class_instance.start_new_calculation()
         # if the user has not yet performed graph traversal, or changed the cutoff value,
         # then perform graph traversal and scope analysis
         if (
             panel_lca_class_instance.df_graph_traversal_nodes.empty or
             widget_float_slider_cutoff.value / 100 != panel_lca_class_instance.graph_traversal_cutoff
         ):
-            perform_graph_traversal(event)
-            perform_scope_analysis(event)
-        # if the user has already provided input data, we reset the dataframe
-        elif panel_lca_class_instance.bool_user_provided_data == True:
-            pn.state.notifications.error('You are not allowed to edit a table which has already been re-computed on your input! Resetting the table...', duration=5000)
-            perform_graph_traversal(event)
-            perform_scope_analysis(event)
+            if await perform_graph_traversal(event, calculation_id):
+                perform_scope_analysis(event)
         # if the user has overriden either supply or burden intensity values in the table,
-        # then update upstream values based on user input
-        elif (
-            (panel_lca_class_instance.df_tabulator['SupplyAmount'] != panel_lca_class_instance.df_tabulator_from_traversal['SupplyAmount']).any() or 
-            (panel_lca_class_instance.df_tabulator['BurdenIntensity'] != panel_lca_class_instance.df_tabulator_from_traversal['BurdenIntensity']).any()
+        # then update upstream values based on user input (on top of all previous user input)
+        elif any(
+            column in ('SupplyAmount', 'BurdenIntensity')
+            for uid, column, old, new in panel_lca_class_instance.list_tabulator_edits
         ):
-            panel_lca_class_instance.bool_user_provided_data = True
-            panel_lca_class_instance.df_tabulator_from_user = panel_lca_class_instance.df_tabulator.copy()
-            update_data_based_on_user_input(event)
-            perform_scope_analysis(event)
-        elif (
-            (panel_lca_class_instance.df_tabulator['Scope'] != panel_lca_class_instance.df_tabulator_from_traversal['Scope']).any()
+            if await update_data_based_on_user_input(event, calculation_id):
+                perform_scope_analysis(event)
+        elif any(
+            column == 'Scope'
+            for uid, column, old, new in panel_lca_class_instance.list_tabulator_edits
         ):
+            panel_lca_class_instance.list_tabulator_edits = []
             perform_scope_analysis(event)
 
 
+async def button_action_portfolio(event):
+    if panel_lca_class_instance.db is None:
+        pn.state.notifications.error('Please load the database first!', duration=5000)
+        return
+    if widget_file_portfolio.value is None:
+        pn.state.notifications.error('Please upload a CSV file with the columns "product" and "amount" first!', duration=5000)
+        return
+    try:
+        panel_lca_class_instance.set_portfolio(read_portfolio_csv(widget_file_portfolio.value))
+    except (ValueError, pd.errors.ParserError) as error:
+        pn.state.notifications.error(str(error), duration=10000)
+        return
+    pn.state.notifications.info(f'Calculating scores of {len(panel_lca_class_instance.df_portfolio)} products...', duration=5000)
+    await run_calculation_stage(None, panel_lca_class_instance.perform_portfolio_lca, event)
+    widget_tabulator_portfolio.value = panel_lca_class_instance.df_portfolio_scores
+    pn.state.notifications.success('Portfolio Calculation Complete!', duration=5000)
+
+
+def update_monte_carlo_view(dict_monte_carlo: dict):
+    """
+    Shows the progress and the running statistics of a Monte Carlo simulation run (see `panel_lca_class.perform_monte_carlo`).
+    """
+    if dict_monte_carlo.get('statistics') is None:
+        return
+    int_done: int = len(dict_monte_carlo['samples'])
+    widget_progress_monte_carlo.value = min(int_done, widget_progress_monte_carlo.max)
+    widget_tabulator_monte_carlo.value = dict_monte_carlo['statistics']
+    widget_statictext_monte_carlo.value = f'{int_done:,} of {dict_monte_carlo["iterations"]:,}' + (
+        ' (converged)' if dict_monte_carlo['converged'] else ''
+    )
+
+
+async def button_action_monte_carlo(event):
+    if panel_lca_class_instance.lca is None:
+        pn.state.notifications.error('Please perform an LCA Calculation first!', duration=5000)
+        return
+    panel_lca_class_instance.int_monte_carlo_iterations = widget_int_monte_carlo_iterations.value
+    dict_monte_carlo: dict = {}
+    widget_progress_monte_carlo.param.update(max=widget_int_monte_carlo_iterations.value, value=0)
+    widget_button_monte_carlo.disabled = True # one run at a time per session
+    pn.state.notifications.info('Running Monte Carlo simulation...', duration=5000)
+    calculation_id: int = panel_lca_class_instance.int_calculation_id
+    try:
+        if sys.platform == 'emscripten':
+            # stages run inline in Pyodide (see `run_calculation_stage`), so that the batches are iterated here,
+            # yielding to the event loop after every batch to show the progress
+            async with panel_lca_class_instance.calculation_lock:
+                if calculation_id == panel_lca_class_instance.int_calculation_id:
+                    for _ in panel_lca_class_instance.iterate_monte_carlo(event, dict_monte_carlo):
+                        update_monte_carlo_view(dict_monte_carlo)
+                        await asyncio.sleep(0)
+            if calculation_id != panel_lca_class_instance.int_calculation_id:
+                return
+        else:
+            task = asyncio.ensure_future(run_calculation_stage(
+                calculation_id,
+                panel_lca_class_instance.perform_monte_carlo,
+                event,
+                dict_monte_carlo
+            ))
+            while not task.done():
+                await asyncio.wait({task}, timeout=0.5)
+                update_monte_carlo_view(dict_monte_carlo)
+            if not task.result():
+                return
+    except RuntimeError as error:
+        pn.state.notifications.error(str(error), duration=10000)
+        return
+    finally:
+        widget_button_monte_carlo.disabled = False
+    update_monte_carlo_view(dict_monte_carlo)
+    pn.state.notifications.success('Monte Carlo Simulation Complete!', duration=5000)
+
+
+def tabulator_action_edit(event):
+    panel_lca_class_instance.add_tabulator_edit(event)
+
+
 widget_button_load_db = pn.widgets.Button( 
     name='Load USEEIO Database',
     icon='database-plus',
@@ -895,6 +3113,26 @@ widget_autocomplete_product = pn.widgets.AutocompleteInput(
     sizing_mode='stretch_width'
 )
 
+
+def input_action_search_product(event):
+    """
+    For large product catalogues, sets the options of the autocomplete widget
+    to the products matching the text typed so far (see `search_product_catalogue`),
+    instead of sending all product names to the browser.
+    """
+    if (
+        len(panel_lca_class_instance.list_db_products) <= panel_lca_class_instance.int_autocomplete_max_options or
+        event.new is None or
+        len(event.new) < widget_autocomplete_product.min_characters
+    ):
+        return
+    widget_autocomplete_product.options = panel_lca_class_instance.get_dict_db_products(
+        indices=search_product_catalogue(panel_lca_class_instance.product_catalogue, event.new)
+    )
+
+
+widget_autocomplete_product.param.watch(input_action_search_product, 'value_input')
+
 markdown_method_documentation = pn.pane.Markdown("""
 The impact assessment methods are documented [in Table 3](https://www.nature.com/articles/s41597-022-01293-7/tables/4) of the [USEEIO release article](https://doi.org/10.1038/s41597-022-01293-7).
 """)
@@ -906,6 +3144,14 @@ widget_select_method = pn.widgets.Select(
 
 )
 
+widget_select_method.param.watch(select_action_method, 'value')
+
+widget_checkbox_all_methods = pn.widgets.Checkbox(
+    name='Compute all impact categories at once',
+    value=True,
+    sizing_mode='stretch_width'
+)
+
 widget_float_input_amount = pn.widgets.FloatInput( 
     name='(Monetary) Amount of Reference Product [USD]',
     value=100,
@@ -957,6 +3203,111 @@ widget_plotly_figure_piechart = pn.pane.Plotly(
         {'Scope 1': 0}
     )
 )
+widget_plotly_figure_piechart.param.watch(plotly_action_select_scope, 'click_data')
+
+widget_radio_breakdown = pn.widgets.RadioButtonGroup(
+    options=['Activities', 'Depth'],
+    value='Activities',
+    button_type='success',
+    sizing_mode='stretch_width'
+)
+widget_radio_breakdown.param.watch(update_scope_breakdown_view, 'value')
+
+widget_select_breakdown_scope = pn.widgets.Select(
+    name='Breakdown of Scope (click the pie chart to select)',
+    options=['All', 'Scope 1', 'Scope 2', 'Scope 3'],
+    value='All',
+    sizing_mode='stretch_width'
+)
+widget_select_breakdown_scope.param.watch(update_scope_breakdown_view, 'value')
+
+widget_tabulator_breakdown = pn.widgets.Tabulator(
+    pd.DataFrame([['']], columns=['Breakdown will appear here after calculations...']),
+    theme='site',
+    show_index=False,
+    disabled=True,
+    layout='fit_data_stretch',
+    sizing_mode='stretch_width',
+    max_height=300
+)
+
+markdown_sensitivity_documentation = pn.pane.Markdown("""
+Exchanges (use of a product by an activity) to which the LCA score is most sensitive.
+A sensitivity of 0.2 means that using 1% more of the product changes the score by 0.2%.
+The column 'Sensitivity' of the table of upstream processes shows, for every row, the sensitivity to the exchange which an edit of its supply amount changes.
+""")
+
+widget_tabulator_sensitivity = pn.widgets.Tabulator(
+    pd.DataFrame([['']], columns=['Sensitivities will appear here after calculations...']),
+    theme='site',
+    show_index=False,
+    disabled=True,
+    layout='fit_data_stretch',
+    sizing_mode='stretch_width',
+    max_height=300
+)
+
+card_sensitivity = pn.Card(
+    markdown_sensitivity_documentation,
+    widget_tabulator_sensitivity,
+    title='Most Sensitive Exchanges',
+    collapsed=True,
+    sizing_mode='stretch_width'
+)
+
+markdown_monte_carlo_documentation = pn.pane.Markdown("""
+Propagates the uncertainty of the database to the LCA score and the scope shares, with a Monte Carlo simulation
+of the reference product, amount and method of the last LCA calculation.
+The simulation stops early once the 95% interval (2.5% to 97.5%) of the score is stable.
+""")
+
+widget_int_monte_carlo_iterations = pn.widgets.IntInput(
+    name='Maximum Number of Iterations',
+    value=1000,
+    step=100,
+    start=10,
+    sizing_mode='stretch_width'
+)
+
+widget_button_monte_carlo = pn.widgets.Button(
+    name='Run Uncertainty Analysis',
+    icon='chart-histogram',
+    button_type='primary',
+    sizing_mode='stretch_width'
+)
+widget_button_monte_carlo.on_click(button_action_monte_carlo)
+
+widget_progress_monte_carlo = pn.indicators.Progress(
+    value=0,
+    max=1000,
+    sizing_mode='stretch_width'
+)
+
+widget_statictext_monte_carlo = pn.widgets.StaticText(
+    name='Iterations',
+    value=None
+)
+
+widget_tabulator_monte_carlo = pn.widgets.Tabulator(
+    pd.DataFrame([['']], columns=['Uncertainty ranges will appear here after calculations...']),
+    theme='site',
+    show_index=False,
+    disabled=True,
+    layout='fit_data_stretch',
+    sizing_mode='stretch_width',
+)
+
+card_monte_carlo = pn.Card(
+    markdown_monte_carlo_documentation,
+    widget_int_monte_carlo_iterations,
+    widget_button_monte_carlo,
+    widget_progress_monte_carlo,
+    widget_statictext_monte_carlo,
+    widget_tabulator_monte_carlo,
+    title='Uncertainty (Monte Carlo)',
+    collapsed=True,
+    sizing_mode='stretch_width'
+)
 
 col1 = pn.Column(
     '# LCA Settings',
@@ -964,6 +3315,7 @@ col1 = pn.Column(
     widget_autocomplete_product,
     markdown_method_documentation,
     widget_select_method,
+    widget_checkbox_all_methods,
     widget_float_input_amount,
     markdown_cutoff_documentation,
     widget_float_slider_cutoff,
@@ -972,52 +3324,116 @@ col1 = pn.Column(
     pn.Spacer(height=10),
     widget_number_lca_score,
     widget_plotly_figure_piechart,
+    widget_radio_breakdown,
+    widget_select_breakdown_scope,
+    widget_tabulator_breakdown,
+    card_sensitivity,
+    card_monte_carlo,
 )
 
 # COLUMN 2 ####################################################################
 
 
-def highlight_tabulator_cells(tabulator_row):
-    """
-    Applies a background color to all rows where the 'Edited?' column is True.
-
-    See Also
-    --------
-    - https://stackoverflow.com/a/48306463
-    - https://discourse.holoviz.org/t/dynamic-update-of-tabulator-style
-    """
-    if tabulator_row['Edited?'] == True:
-        return ['background-color: orange'] * len(tabulator_row)
-    else:
-        return [''] * len(tabulator_row)
-    
+"""
+Highlights the edited rows of the table in the browser: the tick of the 'Edited?' column (see `update_traversal_based_on_coefficient_changes`) marks the row.
+This replaces a row-wise pandas Styler, which is computed on the server for all rows of the table, also with remote pagination.
+Panel sets the Tabulator `rowFormatter` itself, so that the rows are selected with CSS instead.
+"""
+css_tabulator_edited_rows = """
+.tabulator-row:has(.tabulator-cell[tabulator-field="Edited?"] svg) {
+    background-color: orange;
+}
+"""
 
 widget_tabulator = pn.widgets.Tabulator(
     pd.DataFrame([['']], columns=['Data will appear here after calculations...']),
     theme='site',
     show_index=False,
     hidden_columns=['activity_datapackage_id', 'producer_unique_id'],
+    formatters={'Edited?': {'type': 'tickCross', 'crossElement': False}},
+    stylesheets=[css_tabulator_edited_rows],
+    page_size=100,
     layout='fit_data_stretch',
     sizing_mode='stretch_width'
 )
-widget_tabulator.style.apply(highlight_tabulator_cells, axis=1)
+widget_tabulator.on_edit(tabulator_action_edit)
 
-filename_download, button_download = widget_tabulator.download_menu(
-    text_kwargs={'name': 'Filename', 'value': 'filename.csv'},
-    button_kwargs={'name': 'Download Table'}
+filename_download = pn.widgets.TextInput(
+    name='Filename',
+    value='filename.csv',
+    sizing_mode='stretch_width'
+)
+
+button_download = pn.widgets.FileDownload(
+    callback=functools.partial(get_tabulator_csv, widget_tabulator),
+    filename=filename_download.value,
+    label='Download Table',
+    icon='download',
+    align='center'
 )
-filename_download.sizing_mode = 'stretch_width'
-button_download.align = 'center'
-button_download.icon = 'download'
+filename_download.link(button_download, value='filename')
 
 widget_cutoff_indicator_statictext = pn.widgets.StaticText(
     name='Includes processes responsible for amount of emissions [%]',
     value=None
 )
 
+markdown_portfolio_documentation = pn.pane.Markdown("""
+Upload a CSV file with the columns `product` (name or node id) and `amount` (eg. a spend ledger)
+to compute the scores of all products for all impact categories at once.
+""")
+
+widget_file_portfolio = pn.widgets.FileInput(
+    accept='.csv',
+    sizing_mode='stretch_width'
+)
+
+widget_button_portfolio = pn.widgets.Button(
+    name='Compute Portfolio Scores',
+    icon='table',
+    button_type='primary',
+    sizing_mode='stretch_width'
+)
+widget_button_portfolio.on_click(button_action_portfolio)
+
+widget_tabulator_portfolio = pn.widgets.Tabulator(
+    pd.DataFrame([['']], columns=['Portfolio scores will appear here after calculations...']),
+    theme='site',
+    show_index=False,
+    disabled=True,
+    layout='fit_data_stretch',
+    sizing_mode='stretch_width',
+    max_height=400
+)
+
+filename_download_portfolio = pn.widgets.TextInput(
+    name='Filename',
+    value='portfolio_scores.csv'
+)
+
+button_download_portfolio = pn.widgets.FileDownload(
+    callback=functools.partial(get_tabulator_csv, widget_tabulator_portfolio),
+    filename=filename_download_portfolio.value,
+    label='Download Portfolio Scores',
+    icon='download',
+    align='end'
+)
+filename_download_portfolio.link(button_download_portfolio, value='filename')
+
+card_portfolio = pn.Card(
+    markdown_portfolio_documentation,
+    pn.Row(widget_file_portfolio, widget_button_portfolio),
+    widget_tabulator_portfolio,
+    pn.Row(filename_download_portfolio, button_download_portfolio),
+    title='Portfolio Mode',
+    collapsed=True,
+    sizing_mode='stretch_width'
+)
+
 col2 = pn.Column(
     pn.Row('# Table of Upstream Processes', filename_download, button_download),
-    widget_tabulator
+    widget_tabulator,
+    card_portfolio
 )
 
 # SITE ######################################################################
@@ -0,0 +1,129 @@
+"""
+Monte Carlo simulation of the application (see `panel_lca_class.iterate_monte_carlo` in `index.py`).
+
+The worker processes of the simulation (see `create_monte_carlo_executor` in `index.py`) only import this module,
+and with it only NumPy, SciPy and `bw2calc`, instead of the application with Panel and all Brightway packages.
+`bw2calc` is only imported on first use, so that importing this module does not slow down the start of the application.
+"""
+
+import numpy as np
+from scipy.sparse import linalg
+
+
+"""
+Largest memory of one batch of dense technosphere matrices in the Monte Carlo simulation (see `iterate_monte_carlo_batches`).
+"""
+int_monte_carlo_dense_batch_bytes: int = 256 * 1024**2
+
+
+def iterate_monte_carlo_batches(
+        demand: dict,
+        activity_id: int,
+        data_objs: list,
+        scope_2_activity_ids: np.ndarray,
+        dense_max_products: int,
+        seed: int,
+        iterations: int,
+        batch_size: int,
+    ):
+    """
+    Runs Monte Carlo iterations of an LCA and yields the results in batches,
+    as arrays of shape (batch size, 4) with the columns score, scope 1, scope 2 and scope 3.
+
+    Every iteration samples the technosphere, biosphere and characterization matrices
+    from the uncertainty distributions of the datapackages (see `bw2calc.LCA` with `use_distributions=True`).
+    The matrices of a batch are then solved together:
+
+    - Small technosphere matrices (up to `dense_max_products` products) are solved as one stack of dense matrices
+      with a single call of `np.linalg.solve`.
+    - Large technosphere matrices are solved one by one with a sparse LU factorization.
+      Since all samples have the same sparsity pattern, the fill-reducing column ordering
+      (the symbolic part of the factorization) is computed once and re-used for all iterations.
+
+    The scopes are computed from the same samples, consistent with the scope analysis of the graph traversal
+    (see `nodes_dict_to_dataframe` in `index.py`), but without cutoff: scope 1 is the direct burden of the reference product
+    (root node), scope 2 the direct burden of all scope 2 activities and scope 3 the rest of the score.
+
+    Notes
+    -----
+    The datapackages are passed instead of the database, so that no database access is needed
+    and the function can run in worker processes (see `iterate_monte_carlo_batches_in_processes` in `index.py`).
+
+    Parameters
+    ----------
+    demand : dict
+        Demand of one reference product, by node id.
+    activity_id : int
+        Node id of the activity producing the reference product (see `get_production_activity_id` in `index.py`).
+    data_objs : list
+        Datapackages of the LCA (see `bw2data.prepare_lca_inputs`).
+    scope_2_activity_ids : np.ndarray
+        Node ids of the scope 2 activities (see `get_scope_2_activity_ids` in `index.py`).
+    dense_max_products : int
+        Largest technosphere matrix (number of products) which is solved as dense matrix.
+    seed : int
+        Seed of the random number generators.
+    iterations : int
+        Number of iterations.
+    batch_size : int
+        Number of iterations per batch.
+    """
+    import bw2calc as bc
+
+    lca = bc.LCA(demand=demand, data_objs=data_objs, use_distributions=True, seed_override=seed)
+    lca.load_lci_data()
+    lca.load_lcia_data()
+    count: int = lca.technosphere_mm.matrix.shape[0]
+    (node_id, amount), = demand.items()
+    product_index: int = lca.dicts.product[node_id]
+    activity_index: int = lca.dicts.activity[activity_id]
+    array_scope_2 = np.array([
+        lca.dicts.activity[scope_2_activity_id]
+        for scope_2_activity_id in scope_2_activity_ids
+        if scope_2_activity_id in lca.dicts.activity and lca.dicts.activity[scope_2_activity_id] != activity_index
+    ], dtype=int)
+    array_demand = np.zeros(count)
+    array_demand[product_index] = amount
+
+    bool_dense: bool = count <= dense_max_products
+    if bool_dense:
+        batch_size = max(1, min(batch_size, int_monte_carlo_dense_batch_bytes // (count * count * 8)))
+    else:
+        array_permutation: np.ndarray = linalg.splu(lca.technosphere_mm.matrix.tocsc()).perm_c
+
+    int_done: int = 0
+    while int_done < iterations:
+        size: int = min(batch_size, iterations - int_done)
+        array_supply = np.empty((size, count))
+        array_intensity = np.empty((size, count))
+        array_production = np.empty(size)
+        if bool_dense:
+            array_technosphere = np.empty((size, count, count))
+        for iteration in range(size):
+            next(lca.technosphere_mm)
+            next(lca.biosphere_mm)
+            next(lca.characterization_mm)
+            matrix_technosphere = lca.technosphere_mm.matrix
+            array_intensity[iteration] = lca.biosphere_mm.matrix.T @ lca.characterization_mm.matrix.diagonal()
+            array_production[iteration] = matrix_technosphere[product_index, activity_index]
+            if bool_dense:
+                array_technosphere[iteration] = matrix_technosphere.toarray()
+            else:
+                lu = linalg.splu(matrix_technosphere.tocsc()[:, array_permutation], permc_spec='NATURAL')
+                array_supply[iteration, array_permutation] = lu.solve(array_demand)
+        if bool_dense:
+            array_supply = np.linalg.solve(array_technosphere, np.broadcast_to(array_demand, (size, count))[..., None])[..., 0]
+
+        array_score = np.einsum('ij,ij->i', array_intensity, array_supply)
+        array_scope_1 = array_intensity[:, activity_index] * amount / array_production
+        array_scope_2_burden = np.einsum('ij,ij->i', array_intensity[:, array_scope_2], array_supply[:, array_scope_2])
+        yield np.column_stack([array_score, array_scope_1, array_scope_2_burden, array_score - array_scope_1 - array_scope_2_burden])
+        int_done += size
+
+
+def run_monte_carlo_worker(**kwargs) -> np.ndarray:
+    """
+    Runs Monte Carlo iterations in a worker process (see `iterate_monte_carlo_batches_in_processes` in `index.py`)
+    and returns all their samples as one array.
+    """
+    return np.vstack(list(iterate_monte_carlo_batches(**kwargs)))
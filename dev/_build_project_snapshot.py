@@ -0,0 +1,52 @@
+# %%
+"""
+Builds the pre-built snapshot of the USEEIO-1.1 Brightway project for the Pyodide application (see `_README.md`):
+
+1. The project is installed with `bw2io.install_project` into a temporary Brightway directory,
+   so that no local project is changed.
+2. The project directory (SQLite database and processed datapackages) is written to a gzip-compressed `.tar` archive.
+3. The SHA-256 checksum of the archive is written next to it, in the format of `sha256sum`.
+
+The Pyodide application downloads the snapshot from `snapshots/USEEIO-1.1.tar.gz` next to its worker script
+(see `dict_project_snapshots` in `app/index.py`). The versions of `bw2data` and `bw2io` must be those of the application.
+
+Usage:
+
+```bash
+python dev/_build_project_snapshot.py pyodide/snapshots
+```
+"""
+
+import hashlib
+import os
+import sys
+import tarfile
+import tempfile
+from pathlib import Path
+
+PROJECT_NAME = 'USEEIO-1.1'
+
+
+def build_project_snapshot(path_directory: Path) -> Path:
+    """
+    Installs the project into a temporary Brightway directory and returns the path of its snapshot in `path_directory`.
+    """
+    with tempfile.TemporaryDirectory() as directory_brightway:
+        os.environ['BRIGHTWAY_DIR'] = directory_brightway
+        import bw2data as bd
+        import bw2io as bi
+
+        bi.install_project(project_key=PROJECT_NAME, overwrite_existing=True)
+        name_project: str = bd.utils.safe_filename(PROJECT_NAME, full=False)
+        path_directory.mkdir(parents=True, exist_ok=True)
+        path_snapshot = path_directory / f'{PROJECT_NAME}.tar.gz'
+        with tarfile.open(path_snapshot, 'w:gz') as tar:
+            tar.add(Path(bd.projects._base_data_dir) / name_project, arcname=name_project)
+    return path_snapshot
+
+
+if __name__ == '__main__':
+    path_snapshot: Path = build_project_snapshot(Path(sys.argv[1] if len(sys.argv) > 1 else 'pyodide/snapshots'))
+    sha256: str = hashlib.sha256(path_snapshot.read_bytes()).hexdigest()
+    Path(f'{path_snapshot}.sha256').write_text(f'{sha256}  {path_snapshot.name}\n')
+    print(f'Built {path_snapshot}')
@@ -0,0 +1,125 @@
+# %%
+"""
+Post-processes the Pyodide worker generated by `panel convert` (see `_README.md`):
+
+1. The packages of `env_spec` are installed concurrently (instead of one `micropip.install` call after the other),
+   with one `micropip.install` call per package, so that the status messages and errors still name the package.
+2. Wheels (`*.whl`) are cached in the browser Cache Storage, so that returning visitors skip the downloads.
+   Wheel file names are versioned, so that cached wheels never become stale.
+   Bump `WHEEL_CACHE_NAME` to invalidate the cache.
+3. The package installation time is written to the browser console.
+4. The modules of the application next to `app/index.py` (see `APP_MODULES`) are written to the Pyodide file system,
+   since `panel convert` only bundles the script itself.
+
+Usage:
+
+```bash
+python dev/_patch_pyodide_worker.py pyodide/index.js
+```
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+
+WHEEL_CACHE_NAME = 'brightway-webapp-wheels-v1'
+APP_MODULES = ['montecarlo_worker.py']
+PATH_APP = Path(__file__).parents[1] / 'app'
+
+JS_FETCH_WHEEL_CACHE = f"""
+const WHEEL_CACHE_NAME = '{WHEEL_CACHE_NAME}';
+const fetchWithoutWheelCache = self.fetch.bind(self);
+
+self.fetch = async (resource, options) => {{
+  const url = (resource instanceof Request) ? resource.url : String(resource);
+  if (!url.split('?')[0].endsWith('.whl') || !('caches' in self)) {{
+    return fetchWithoutWheelCache(resource, options);
+  }}
+  try {{
+    const cache = await caches.open(WHEEL_CACHE_NAME);
+    const cached = await cache.match(url);
+    if (cached) {{
+      return cached;
+    }}
+    const response = await fetchWithoutWheelCache(resource, options);
+    if (response.ok) {{
+      await cache.put(url, response.clone());
+    }}
+    return response;
+  }} catch(e) {{
+    console.log(e)
+    return fetchWithoutWheelCache(resource, options);
+  }}
+}};
+"""
+
+JS_INSTALL_PACKAGES = """  const time_install_start = performance.now()
+  await Promise.all(env_spec.map(async (pkg) => {
+    let pkg_name;
+    if (pkg.endsWith('.whl')) {
+      pkg_name = pkg.split('/').slice(-1)[0].split('-')[0]
+    } else {
+      pkg_name = pkg
+    }
+    self.postMessage({type: 'status', msg: `Installing ${pkg_name}`})
+    try {
+      await self.pyodide.runPythonAsync(`
+        import micropip
+        await micropip.install('${pkg}');
+      `);
+    } catch(e) {
+      console.log(e)
+      self.postMessage({
+	type: 'status',
+	msg: `Error while installing ${pkg_name}`
+      });
+    }
+  }));
+  console.log(`Packages installed in ${Math.round(performance.now() - time_install_start)} ms`);
+"""
+
+JS_WRITE_APP_MODULES = """  const app_modules = {app_modules};
+  const site_packages = self.pyodide.runPython('import site; site.getsitepackages()[0]');
+  for (const [name, source] of Object.entries(app_modules)) {{
+    self.pyodide.FS.writeFile(`${{site_packages}}/${{name}}`, source);
+  }}
+"""
+
+PATTERN_INSTALL_LOOP = re.compile(
+    r'  for \(const pkg of env_spec\) \{\n.*?\n  \}\n(?=  console\.log\("Packages loaded!"\);)',
+    flags=re.DOTALL
+)
+PATTERN_START_APPLICATION = re.compile(r'\nasync function startApplication\(\) \{\n')
+PATTERN_PACKAGES_LOADED = re.compile(r'  console\.log\("Packages loaded!"\);\n')
+
+
+def patch_pyodide_worker(code: str) -> str:
+    """
+    Returns the code of the Pyodide worker with concurrent package installation, wheel caching and the modules of the application.
+    Raises a `ValueError` if the worker does not have the structure generated by `panel convert`.
+    Patching an already patched worker does not change it.
+    """
+    if 'WHEEL_CACHE_NAME' not in code:
+        code, number_install_loops = PATTERN_INSTALL_LOOP.subn(JS_INSTALL_PACKAGES, code, count=1)
+        code, number_start_applications = PATTERN_START_APPLICATION.subn(
+            JS_FETCH_WHEEL_CACHE + r'\g<0>', code, count=1
+        )
+        if number_install_loops != 1 or number_start_applications != 1:
+            raise ValueError('Unexpected structure of the Pyodide worker generated by `panel convert`.')
+    if 'const app_modules' not in code:
+        dict_app_modules: dict = {name: (PATH_APP / name).read_text() for name in APP_MODULES}
+        code, number_packages_loaded = PATTERN_PACKAGES_LOADED.subn(
+            lambda match: JS_WRITE_APP_MODULES.format(app_modules=json.dumps(dict_app_modules)) + match.group(0),
+            code,
+            count=1
+        )
+        if number_packages_loaded != 1:
+            raise ValueError('Unexpected structure of the Pyodide worker generated by `panel convert`.')
+    return code
+
+
+if __name__ == '__main__':
+    path_worker = Path(sys.argv[1] if len(sys.argv) > 1 else 'pyodide/index.js')
+    path_worker.write_text(patch_pyodide_worker(path_worker.read_text()))
+    print(f'Patched {path_worker}')
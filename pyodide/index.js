@@ -8,6 +8,31 @@ function sendPatch(patch, buffers, msg_id) {
   })
 }
 
+const WHEEL_CACHE_NAME = 'brightway-webapp-wheels-v1';
+const fetchWithoutWheelCache = self.fetch.bind(self);
+
+self.fetch = async (resource, options) => {
+  const url = (resource instanceof Request) ? resource.url : String(resource);
+  if (!url.split('?')[0].endsWith('.whl') || !('caches' in self)) {
+    return fetchWithoutWheelCache(resource, options);
+  }
+  try {
+    const cache = await caches.open(WHEEL_CACHE_NAME);
+    const cached = await cache.match(url);
+    if (cached) {
+      return cached;
+    }
+    const response = await fetchWithoutWheelCache(resource, options);
+    if (response.ok) {
+      await cache.put(url, response.clone());
+    }
+    return response;
+  } catch(e) {
+    console.log(e)
+    return fetchWithoutWheelCache(resource, options);
+  }
+};
+
 async function startApplication() {
   console.log("Loading pyodide!");
   self.postMessage({type: 'status', msg: 'Loading pyodide'})
@@ -16,7 +41,8 @@ async function startApplication() {
   console.log("Loaded!");
   await self.pyodide.loadPackage("micropip");
   const env_spec = ['https://cdn.holoviz.org/panel/wheels/bokeh-3.6.2-py3-none-any.whl', 'https://cdn.holoviz.org/panel/1.6.0/dist/wheels/panel-1.6.0-py3-none-any.whl', 'pyodide-http==0.2.1', 'bw2data==4.0.dev59', 'bw2io==0.9.dev41', 'bw2calc==2.0.dev23', 'bw-graph-tools==0.5', 'plotly==5.24.1', 'lzma']
-  for (const pkg of env_spec) {
+  const time_install_start = performance.now()
+  await Promise.all(env_spec.map(async (pkg) => {
     let pkg_name;
     if (pkg.endsWith('.whl')) {
       pkg_name = pkg.split('/').slice(-1)[0].split('-')[0]
@@ -36,7 +62,8 @@ async function startApplication() {
 	msg: `Error while installing ${pkg_name}`
       });
     }
-  }
+  }));
+  console.log(`Packages installed in ${Math.round(performance.now() - time_install_start)} ms`);
   console.log("Packages loaded!");
   self.postMessage({type: 'status', msg: 'Executing code'})
   const code = `
@@ -0,0 +1,117 @@
+"""
+Fixtures shared by the tests of the application (`app/index.py`).
+
+The LCA model is a small technosphere of four products, built in memory,
+so that no Brightway project is needed:
+
+```
+product 0 (root) <- product 1 <- product 2 <- product 3
+                 <- product 2 <- product 3
+```
+"""
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bw2calc as bc
+import bw_processing as bwp
+
+
+@pytest.fixture(scope='session')
+def app():
+    spec = importlib.util.spec_from_file_location('index', Path(__file__).parents[1] / 'app' / 'index.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+"""
+Node ids of the products (1-4), the activities (11-14) and the biosphere flow (21).
+Product and activity ids differ, as in databases with separate product and process nodes.
+"""
+list_product_ids: list = [1, 2, 3, 4]
+list_activity_ids: list = [11, 12, 13, 14]
+int_flow_id: int = 21
+
+"""
+Technosphere coefficients of the inputs, by (product index, activity index).
+For the Monte Carlo simulation, the inputs are normally distributed (10% standard deviation)
+and the biosphere flows lognormally distributed (geometric standard deviation exp(0.1)).
+"""
+dict_inputs: dict = {
+    (1, 0): -0.5,
+    (2, 0): -0.1,
+    (2, 1): -0.2,
+    (3, 2): -0.3,
+}
+
+
+@pytest.fixture(scope='module')
+def datapackage():
+    dp = bwp.create_datapackage()
+    list_technosphere: list = [(product, activity, 1.0) for product, activity in zip(list_product_ids, list_activity_ids)]
+    list_technosphere += [
+        (list_product_ids[product], list_activity_ids[activity], amount)
+        for (product, activity), amount in dict_inputs.items()
+    ]
+    dp.add_persistent_vector(
+        matrix='technosphere_matrix',
+        indices_array=np.array([(row, column) for row, column, _ in list_technosphere], dtype=bwp.INDICES_DTYPE),
+        data_array=np.array([amount for _, _, amount in list_technosphere]),
+        distributions_array=np.array(
+            [(0, 1.0, np.nan, np.nan, np.nan, np.nan, False)] * len(list_product_ids) +
+            [(3, amount, 0.1 * abs(amount), np.nan, np.nan, np.nan, False) for amount in dict_inputs.values()],
+            dtype=bwp.UNCERTAINTY_DTYPE
+        ),
+        name='technosphere',
+    )
+    dp.add_persistent_vector(
+        matrix='biosphere_matrix',
+        indices_array=np.array([(int_flow_id, activity) for activity in list_activity_ids], dtype=bwp.INDICES_DTYPE),
+        data_array=np.array([1.0, 2.0, 3.0, 4.0]),
+        distributions_array=np.array(
+            [(2, np.log(amount), 0.1, np.nan, np.nan, np.nan, False) for amount in [1.0, 2.0, 3.0, 4.0]],
+            dtype=bwp.UNCERTAINTY_DTYPE
+        ),
+        name='biosphere',
+    )
+    dp.add_persistent_vector(
+        matrix='characterization_matrix',
+        indices_array=np.array([(int_flow_id, int_flow_id)], dtype=bwp.INDICES_DTYPE),
+        data_array=np.array([1.0]),
+        name='characterization',
+    )
+    return dp
+
+
+@pytest.fixture(scope='module')
+def lca(datapackage):
+    lca = bc.LCA(demand={list_product_ids[0]: 1}, data_objs=[datapackage])
+    lca.lci()
+    lca.lcia()
+    return lca
+
+
+@pytest.fixture
+def traversal() -> tuple:
+    """
+    Tabulator dataframe and tree (see `build_traversal_tree`) of the graph traversal of one unit of the root product.
+    Nodes 4 and 5 share the same edge (product 3 used by activity 2), on different branches.
+    """
+    df = pd.DataFrame({
+        'UID': [0, 1, 2, 3, 4, 5],
+        'SupplyAmount': [1.0, 0.5, 0.1, 0.1, 0.03, 0.03],
+        'BurdenIntensity': [1.0, 2.0, 3.0, 3.0, 4.0, 4.0],
+        'Depth': [1, 2, 3, 2, 4, 3],
+    })
+    df['Burden(Direct)'] = df['SupplyAmount'] * df['BurdenIntensity']
+    tree = {
+        'parent': np.array([-1, 0, 1, 0, 2, 3]),
+        'row': np.arange(6),
+        'activity_index': np.array([0, 1, 2, 2, 3, 3]),
+        'product_index': np.array([0, 1, 2, 2, 3, 3]),
+    }
+    return df, tree
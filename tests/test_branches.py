@@ -0,0 +1,54 @@
+"""
+Checks of the branches (=paths from the root node) of the nodes of a graph traversal
+(see `compute_branches` in `app/index.py`).
+"""
+import numpy as np
+import pandas as pd
+
+
+"""
+Edges of the example graph in the docstrings of `build_parent_array` and `compute_branches`.
+"""
+df_edges = pd.DataFrame({
+    'consumer_unique_id': [0, 0, 0, 2, 3, 5],
+    'producer_unique_id': [1, 2, 3, 4, 5, 6],
+})
+
+
+def trace_branch(parent: np.ndarray, unique_id: int) -> list:
+    branch: list = [unique_id]
+    while parent[branch[0]] >= 0:
+        branch.insert(0, parent[branch[0]])
+    return branch
+
+
+def test_build_parent_array(app):
+    np.testing.assert_array_equal(app.build_parent_array(df_edges), [-1, 0, 0, 0, 2, 3, 5])
+
+
+def test_compute_branches_of_docstring_example(app):
+    flat, offset, length = app.compute_branches(np.array([-1, 0, 0, 0, 2, 3, 5]))
+    np.testing.assert_array_equal(offset, [0, 1, 3, 5, 7, 10, 13])
+    np.testing.assert_array_equal(length, [1, 2, 2, 2, 3, 3, 4])
+    np.testing.assert_array_equal(flat[13:17], [0, 3, 5, 6])
+
+
+def test_compute_branches_matches_traced_branches(app):
+    rng = np.random.default_rng(42)
+    # every node is produced for a node created before it, as in the graph traversal
+    parent = np.array([-1] + [rng.integers(0, unique_id) for unique_id in range(1, 500)])
+    flat, offset, length = app.compute_branches(parent)
+    for unique_id in range(len(parent)):
+        assert flat[offset[unique_id]:offset[unique_id] + length[unique_id]].tolist() == trace_branch(parent, unique_id)
+
+
+def test_branches_as_lists_and_as_offsets_are_equal(app):
+    df_lists = app.add_branch_information_to_edges_dataframe(df_edges)
+    assert df_lists['Branch'].tolist() == [[0, 1], [0, 2], [0, 3], [0, 2, 4], [0, 3, 5], [0, 3, 5, 6]]
+
+    df_offsets = app.add_branch_information_to_edges_dataframe(df_edges, store_as_offsets=True)
+    flat: np.ndarray = df_offsets.attrs['BranchArray']
+    assert [
+        flat[start:start + length].tolist()
+        for start, length in zip(df_offsets['BranchOffset'], df_offsets['BranchLength'])
+    ] == df_lists['Branch'].tolist()
@@ -0,0 +1,178 @@
+"""
+Checks of the translation of table edits into changes of the LCA model
+(see `get_coefficient_changes_from_user_edits` in `app/index.py`).
+
+The LCA model is the small technosphere of four products of `tests/conftest.py`.
+"""
+import numpy as np
+import pytest
+from scipy import sparse
+
+
+def get_changed_technosphere_matrix(lca, dict_technosphere: dict) -> sparse.csc_matrix:
+    matrix = lca.technosphere_matrix.tolil(copy=True)
+    for (row, column), value in dict_technosphere.items():
+        matrix[row, column] = value
+    return matrix.tocsc()
+
+
+def test_solve_technosphere_with_updates_matches_spsolve(app, lca):
+    dict_technosphere: dict = {(1, 0): -0.8, (3, 2): -0.6, (2, 3): -0.05}
+    demand = np.array([2.0, 0.0, 1.0, 0.0])
+    supply = app.solve_technosphere_with_updates(lca, demand, dict_technosphere)
+    supply_expected = sparse.linalg.spsolve(get_changed_technosphere_matrix(lca, dict_technosphere), demand)
+    np.testing.assert_allclose(supply, supply_expected, rtol=1e-12)
+
+
+def test_solve_technosphere_with_updates_raises_if_singular(app, lca):
+    with pytest.raises(np.linalg.LinAlgError):
+        app.solve_technosphere_with_updates(lca, np.array([1.0, 0.0, 0.0, 0.0]), {(0, 0): 0.0})
+
+
+def test_supply_edit_propagates_along_branches_and_shared_edges(app, lca, traversal):
+    df_original, tree = traversal
+    dict_overrides: dict = {1: {'SupplyAmount': 1.0}, 4: {'SupplyAmount': 0.12}}
+
+    dict_changes = app.get_coefficient_changes_from_user_edits(df_original, tree, dict_overrides, lca)
+    assert dict_changes['demand_ratio'] == 1.0
+    assert dict_changes['technosphere'] == pytest.approx({(1, 0): -1.0, (3, 2): -0.6})
+
+    df = app.update_traversal_based_on_coefficient_changes(
+        df_original.copy(), tree, dict_changes, dict_overrides, lca
+    )
+    # node 1 doubles, and with it its subtree (nodes 2 and 4); the edge of node 4 doubles as well,
+    # also for node 5 on the other branch; node 3 is not below an edited edge
+    np.testing.assert_allclose(df['SupplyAmount'], [1.0, 1.0, 0.2, 0.1, 0.12, 0.06])
+    np.testing.assert_allclose(df['Burden(Direct)'], df['SupplyAmount'] * df['BurdenIntensity'])
+    assert df['Edited?'].tolist() == [False, True, False, False, True, False]
+
+    score = app.compute_lca_score_with_coefficient_changes(lca, lca.demand, dict_changes)
+    supply = sparse.linalg.spsolve(
+        get_changed_technosphere_matrix(lca, dict_changes['technosphere']),
+        np.array([1.0, 0.0, 0.0, 0.0])
+    )
+    assert score == pytest.approx(np.array([1.0, 2.0, 3.0, 4.0]) @ supply, rel=1e-12)
+
+
+def test_root_supply_edit_scales_demand(app, lca, traversal):
+    df_original, tree = traversal
+    dict_overrides: dict = {0: {'SupplyAmount': 3.0}}
+
+    dict_changes = app.get_coefficient_changes_from_user_edits(df_original, tree, dict_overrides, lca)
+    assert dict_changes == {'demand_ratio': 3.0, 'technosphere': {}, 'intensity': {}}
+
+    df = app.update_traversal_based_on_coefficient_changes(
+        df_original.copy(), tree, dict_changes, dict_overrides, lca
+    )
+    np.testing.assert_allclose(df['SupplyAmount'], 3 * df_original['SupplyAmount'])
+    assert app.compute_lca_score_with_coefficient_changes(lca, lca.demand, dict_changes) == pytest.approx(3 * lca.score)
+
+
+def test_burden_intensity_edit_applies_to_all_nodes_of_the_activity(app, lca, traversal):
+    df_original, tree = traversal
+    dict_overrides: dict = {2: {'BurdenIntensity': 10.0}}
+
+    dict_changes = app.get_coefficient_changes_from_user_edits(df_original, tree, dict_overrides, lca)
+    assert dict_changes['intensity'] == {2: 10.0}
+
+    df = app.update_traversal_based_on_coefficient_changes(
+        df_original.copy(), tree, dict_changes, dict_overrides, lca
+    )
+    np.testing.assert_allclose(df['BurdenIntensity'], [1.0, 2.0, 10.0, 10.0, 4.0, 4.0])
+    np.testing.assert_allclose(df['SupplyAmount'], df_original['SupplyAmount'])
+
+
+def test_supply_edit_of_node_with_zero_supply_raises(app, lca, traversal):
+    df_original, tree = traversal
+    df_original.loc[4, 'SupplyAmount'] = 0.0
+    with pytest.raises(ValueError):
+        app.get_coefficient_changes_from_user_edits(df_original, tree, {4: {'SupplyAmount': 0.1}}, lca)
+
+
+def test_supply_edit_below_edited_parent_in_same_round(app, lca, traversal):
+    df_original, tree = traversal
+    dict_overrides: dict = {1: {'SupplyAmount': 0.25}, 0: {'SupplyAmount': 2.0}}
+
+    dict_changes = app.get_coefficient_changes_from_user_edits(df_original, tree, dict_overrides, lca)
+    assert dict_changes['demand_ratio'] == 2.0
+    assert dict_changes['technosphere'] == pytest.approx({(1, 0): -0.125})
+
+    df = app.update_traversal_based_on_coefficient_changes(
+        df_original.copy(), tree, dict_changes, dict_overrides, lca
+    )
+    np.testing.assert_allclose(df['SupplyAmount'], [2.0, 0.25, 0.05, 0.2, 0.015, 0.06])
+
+
+def get_panel_lca(app, lca, traversal):
+    """
+    Returns a `panel_lca_class` with the graph traversal of the fixtures, as after `perform_graph_traversal`.
+    """
+    df_original, tree = traversal
+    panel_lca = app.panel_lca_class()
+    panel_lca.lca = lca
+    (panel_lca.chosen_activity_id, panel_lca.chosen_amount), = lca.demand.items()
+    panel_lca.df_tabulator_from_traversal = df_original
+    panel_lca.df_tabulator = df_original.copy()
+    panel_lca.dict_traversal_tree = tree
+    return panel_lca
+
+
+def edit_supply_amounts(panel_lca, dict_supply: dict) -> None:
+    """
+    Runs one round of edits of the supply amounts, by `unique_id` (see `panel_lca_class.update_data_based_on_user_input`).
+    """
+    for uid, value in dict_supply.items():
+        row: int = panel_lca.dict_traversal_tree['row'][uid]
+        panel_lca.list_tabulator_edits.append((uid, 'SupplyAmount', panel_lca.df_tabulator['SupplyAmount'].iloc[row], value))
+        # as the tabulator widget, which writes edits to its dataframe
+        panel_lca.df_tabulator.iloc[row, panel_lca.df_tabulator.columns.get_loc('SupplyAmount')] = value
+    panel_lca.update_data_based_on_user_input(None)
+
+
+def test_supply_edit_below_edited_parent_across_rounds(app, lca, traversal):
+    panel_lca = get_panel_lca(app, lca, traversal)
+    edit_supply_amounts(panel_lca, {1: 1.0})
+    np.testing.assert_allclose(panel_lca.df_tabulator['SupplyAmount'], [1.0, 1.0, 0.2, 0.1, 0.06, 0.03])
+
+    edit_supply_amounts(panel_lca, {2: 1.0})
+    np.testing.assert_allclose(panel_lca.df_tabulator['SupplyAmount'], [1.0, 1.0, 1.0, 0.1, 0.3, 0.03])
+    assert panel_lca.df_tabulator['Edited?'].tolist() == [False, True, True, False, False, False]
+
+    supply = sparse.linalg.spsolve(
+        get_changed_technosphere_matrix(lca, {(1, 0): -1.0, (2, 1): -1.0}),
+        np.array([1.0, 0.0, 0.0, 0.0])
+    )
+    assert panel_lca.float_lca_score_user_input == pytest.approx(np.array([1.0, 2.0, 3.0, 4.0]) @ supply, rel=1e-12)
+
+
+def test_rounds_of_edits_apply_only_their_own_changes(app, lca, traversal):
+    panel_lca = get_panel_lca(app, lca, traversal)
+    edit_supply_amounts(panel_lca, {2: 0.2})
+    np.testing.assert_allclose(panel_lca.df_tabulator['SupplyAmount'], [1.0, 0.5, 0.2, 0.1, 0.06, 0.03])
+    assert set(panel_lca.dict_technosphere_solves) == {0, 2}
+
+    # the edge of node 2 keeps its changed coefficient, so that node 2 doubles with its parent
+    edit_supply_amounts(panel_lca, {1: 1.0})
+    np.testing.assert_allclose(panel_lca.df_tabulator['SupplyAmount'], [1.0, 1.0, 0.4, 0.1, 0.12, 0.03])
+    assert set(panel_lca.dict_technosphere_solves) == {0, 1, 2}
+    assert panel_lca.dict_coefficient_changes['technosphere'] == pytest.approx({(1, 0): -1.0, (2, 1): -0.4})
+
+    # restoring the original value removes the mark of the edited row
+    edit_supply_amounts(panel_lca, {1: 0.5})
+    np.testing.assert_allclose(panel_lca.df_tabulator['SupplyAmount'], [1.0, 0.5, 0.2, 0.1, 0.06, 0.03])
+    assert panel_lca.df_tabulator['Edited?'].tolist() == [False, False, True, False, False, False]
+
+    supply = sparse.linalg.spsolve(
+        get_changed_technosphere_matrix(lca, {(2, 1): -0.4}),
+        np.array([1.0, 0.0, 0.0, 0.0])
+    )
+    assert panel_lca.float_lca_score_user_input == pytest.approx(np.array([1.0, 2.0, 3.0, 4.0]) @ supply, rel=1e-12)
+
+
+def test_solve_technosphere_with_updates_reuses_solves(app, lca):
+    dict_technosphere: dict = {(1, 0): -0.8}
+    demand = np.array([1.0, 0.0, 0.0, 0.0])
+    dict_solves: dict = {}
+    supply = app.solve_technosphere_with_updates(lca, demand, dict_technosphere, dict_solves)
+    np.testing.assert_allclose(supply, app.solve_technosphere_with_updates(lca, demand, dict_technosphere), rtol=1e-12)
+    assert set(dict_solves) == {0, 1}
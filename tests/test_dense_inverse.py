@@ -0,0 +1,59 @@
+"""
+Checks of the dense inverse of the technosphere matrix for small databases
+(see `dense_inverse_solver_class` and `create_factorized_lca` in `app/index.py`).
+"""
+import types
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+import bw2calc as bc
+
+
+@pytest.fixture
+def create_lca(app, monkeypatch, datapackage):
+    """
+    Replaces `bw2calc.LCA` of a method by the in-memory LCA model, and returns `create_factorized_lca`.
+    """
+    monkeypatch.setattr(app, 'bc', types.SimpleNamespace(
+        LCA=lambda demand, method: bc.LCA(demand=demand, data_objs=[datapackage])
+    ))
+    return app.create_factorized_lca
+
+
+@pytest.mark.parametrize('demand', [
+    np.array([0.0, 0.0, 2.5, 0.0]),
+    np.array([1.0, 0.0, 3.0, -0.5]),
+    np.array([[1.0, 0.0], [0.0, 0.0], [0.0, 2.0], [0.0, 1.0]]),
+])
+def test_dense_inverse_solver_matches_linear_solve(app, lca, demand):
+    solver = app.dense_inverse_solver_class(lca.technosphere_matrix)
+    np.testing.assert_allclose(solver(demand), np.linalg.solve(lca.technosphere_matrix.toarray(), demand), rtol=1e-12)
+
+
+def test_small_technosphere_is_inverted(app, create_lca, lca):
+    lca_factorized = create_lca({1: 2.0}, ('method',))
+    assert isinstance(lca_factorized.solver, app.dense_inverse_solver_class)
+    assert lca_factorized.score == pytest.approx(2 * lca.score, rel=1e-12)
+
+    # the shallow copies of the sessions solve other demands with the inverse
+    lca_factorized.lci(demand={3: 1.0})
+    lca_factorized.lcia_calculation()
+    np.testing.assert_allclose(
+        lca_factorized.supply_array,
+        sparse.linalg.spsolve(lca.technosphere_matrix.tocsc(), np.array([0.0, 0.0, 1.0, 0.0])),
+        rtol=1e-12
+    )
+    np.testing.assert_allclose(
+        app.solve_technosphere(lca_factorized, np.eye(4)),
+        np.linalg.inv(lca.technosphere_matrix.toarray()),
+        rtol=1e-12
+    )
+
+
+def test_large_technosphere_is_factorized(app, monkeypatch, create_lca, lca):
+    monkeypatch.setattr(app, 'int_dense_inverse_max_products', 3)
+    lca_factorized = create_lca({1: 2.0}, ('method',))
+    assert not isinstance(lca_factorized.solver, app.dense_inverse_solver_class)
+    assert lca_factorized.score == pytest.approx(2 * lca.score, rel=1e-12)
@@ -0,0 +1,87 @@
+"""
+Checks of the Monte Carlo simulation
+(see `app/montecarlo_worker.py` and `iterate_monte_carlo_batches_in_processes` in `app/index.py`),
+with the uncertainty distributions of the in-memory LCA model of `tests/conftest.py`.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import montecarlo_worker
+
+
+@pytest.fixture
+def dict_arguments(datapackage) -> dict:
+    """
+    Arguments of `iterate_monte_carlo_batches` for 2 units of product 1 (activity 11),
+    with the activity of product 3 (activity 13) as scope 2 activity.
+    """
+    return {
+        'demand': {1: 2.0},
+        'activity_id': 11,
+        'data_objs': [datapackage],
+        'scope_2_activity_ids': np.array([13]),
+        'dense_max_products': 3000,
+    }
+
+
+def run_monte_carlo(seed: int, iterations: int, batch_size: int, **kwargs) -> np.ndarray:
+    return np.vstack(list(montecarlo_worker.iterate_monte_carlo_batches(seed=seed, iterations=iterations, batch_size=batch_size, **kwargs)))
+
+
+def test_production_activity_id(app, lca):
+    assert [app.get_production_activity_id(lca, product_id) for product_id in [1, 2, 3, 4]] == [11, 12, 13, 14]
+
+
+def test_samples_are_reproducible_with_seed(dict_arguments):
+    samples: np.ndarray = run_monte_carlo(seed=42, iterations=20, batch_size=20, **dict_arguments)
+    assert samples.shape == (20, 4)
+    np.testing.assert_array_equal(run_monte_carlo(seed=42, iterations=20, batch_size=20, **dict_arguments), samples)
+    assert not np.allclose(run_monte_carlo(seed=43, iterations=20, batch_size=20, **dict_arguments), samples)
+
+
+def test_samples_do_not_depend_on_batches_or_solver(dict_arguments):
+    batches: list = list(montecarlo_worker.iterate_monte_carlo_batches(seed=42, iterations=10, batch_size=4, **dict_arguments))
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    samples: np.ndarray = run_monte_carlo(seed=42, iterations=10, batch_size=10, **dict_arguments)
+    np.testing.assert_allclose(np.vstack(batches), samples, rtol=1e-12)
+
+    dict_arguments['dense_max_products'] = 0
+    np.testing.assert_allclose(run_monte_carlo(seed=42, iterations=10, batch_size=4, **dict_arguments), samples, rtol=1e-12)
+
+
+def test_samples_are_split_into_scopes(dict_arguments, lca):
+    samples: np.ndarray = run_monte_carlo(seed=42, iterations=2000, batch_size=100, **dict_arguments)
+    np.testing.assert_allclose(samples[:, 1:].sum(axis=1), samples[:, 0], rtol=1e-12)
+    # the production exchanges have no uncertainty, so that scope 1 is the direct emission of 2 units of activity 11
+    assert np.median(samples[:, 1]) == pytest.approx(2 * 1.0, rel=0.02)
+    # activity 13 is supplied 2 * 0.2 times, with a direct emission of 3 per unit
+    assert np.median(samples[:, 2]) == pytest.approx(2 * 0.2 * 3.0, rel=0.05)
+    assert np.median(samples[:, 0]) == pytest.approx(2 * lca.score, rel=0.02)
+
+
+def test_samples_in_processes_equal_samples_of_their_seeds(app, dict_arguments):
+    list_batches: list = list(app.iterate_monte_carlo_batches_in_processes(
+        int_processes=2, iterations=10, seed=42, batch_size=4, **dict_arguments
+    ))
+    assert sorted(len(batch) for batch in list_batches) == [2, 4, 4]
+    # every batch is a task of its own, with the seed incremented by the number of iterations before it
+    samples_expected: np.ndarray = np.vstack([
+        run_monte_carlo(seed=42 + offset, iterations=size, batch_size=size, **dict_arguments)
+        for offset, size in [(0, 4), (4, 4), (8, 2)]
+    ])
+    samples: np.ndarray = np.vstack(list_batches)
+    np.testing.assert_allclose(samples[np.argsort(samples[:, 0])], samples_expected[np.argsort(samples_expected[:, 0])], rtol=1e-12)
+
+
+def test_statistics_of_samples(app):
+    samples = np.column_stack([np.arange(1.0, 102.0), np.full(101, 0.5), np.zeros(101), np.full(101, 0.5)])
+    samples[:, 1:] *= samples[:, [0]]
+    df: pd.DataFrame = app.compute_monte_carlo_statistics(samples)
+    assert df['Result'].tolist() == ['Score', 'Scope 1 Share', 'Scope 2 Share', 'Scope 3 Share']
+    np.testing.assert_allclose(df.loc[0, ['Mean', '2.5%', '50%', '97.5%']].to_numpy(dtype=float), [51.0, 3.5, 51.0, 98.5])
+    np.testing.assert_allclose(df.loc[1:, 'Mean'], [0.5, 0.0, 0.5])
+
+    # shares of samples with a score of zero are ignored
+    samples[0] = 0.0
+    assert app.compute_monte_carlo_statistics(samples).loc[1, 'Mean'] == pytest.approx(0.5)
@@ -0,0 +1,115 @@
+"""
+Checks of the product catalogue of the product search
+(see `load_product_catalogue` and `search_product_catalogue` in `app/index.py`).
+
+The database is replaced by a catalogue in memory (see `build_product_catalogue`),
+so that no Brightway project is needed.
+"""
+import types
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def catalogue() -> dict:
+    return {
+        'modified': '2024-11-07T10:46:34.178471',
+        'ids': [1, 2, 3, 4, 5, 6, 7],
+        'names': [
+            'Grains; at farm',
+            'Electricity',
+            'Electricity',
+            'Electricity',
+            'Electricity',
+            'Wheat grains',
+            'Automobiles; at manufacturer',
+        ],
+        'locations': ['United States', 'Switzerland', 'France', 'France', 'France', 'Canada', None],
+    }
+
+
+@pytest.fixture
+def bd(app, monkeypatch, tmp_path, catalogue):
+    """
+    Replaces `bw2data` by the project directory `tmp_path` and the metadata of one database 'db'.
+    """
+    bd = types.SimpleNamespace(
+        projects=types.SimpleNamespace(dir=tmp_path),
+        databases={'db': {'modified': catalogue['modified']}},
+    )
+    monkeypatch.setattr(app, 'bd', bd)
+    return bd
+
+
+@pytest.fixture
+def build_product_catalogue(app, monkeypatch, catalogue) -> list:
+    """
+    Replaces `build_product_catalogue` by the catalogue fixture, and returns the list of the databases it was called for.
+    """
+    list_calls: list = []
+
+    def build_product_catalogue(db_name: str) -> dict:
+        list_calls.append(db_name)
+        return dict(
+            catalogue,
+            sorted=sorted(range(len(catalogue['names'])), key=lambda index: catalogue['names'][index].lower()),
+        )
+
+    monkeypatch.setattr(app, 'build_product_catalogue', build_product_catalogue)
+    return list_calls
+
+
+def test_labels_are_unique(app, catalogue):
+    assert app.create_product_catalogue_labels(catalogue) == [
+        'Grains; at farm',
+        'Electricity (Switzerland)',
+        'Electricity (France) [3]',
+        'Electricity (France) [4]',
+        'Electricity (France) [5]',
+        'Wheat grains',
+        'Automobiles; at manufacturer',
+    ]
+
+
+def test_catalogue_is_persisted_and_rebuilt_if_database_is_modified(app, bd, build_product_catalogue):
+    catalogue: dict = app.load_product_catalogue('db')
+    assert (bd.projects.dir / 'product_catalogue_db.json').is_file()
+    assert catalogue['dict_labels_to_ids']['Electricity (Switzerland)'] == 2
+
+    assert app.load_product_catalogue('db')['labels'] == catalogue['labels']
+    assert build_product_catalogue == ['db']
+
+    bd.databases['db']['modified'] = '2025-01-01T00:00:00.000000'
+    app.load_product_catalogue('db')
+    assert build_product_catalogue == ['db', 'db']
+
+
+def test_search_returns_prefix_matches_first(app, bd, build_product_catalogue):
+    catalogue: dict = app.load_product_catalogue('db')
+    # 'Grains; at farm' starts with the query, 'Wheat grains' only contains it
+    assert app.search_product_catalogue(catalogue, 'GRAIN') == [0, 5]
+    assert app.search_product_catalogue(catalogue, 'electricity') == [1, 2, 3, 4]
+    assert app.search_product_catalogue(catalogue, 'electricity', max_results=2) == [1, 2]
+    assert app.search_product_catalogue(catalogue, '; at') == [0, 6]
+
+
+def test_search_does_not_match_across_names(app, bd, build_product_catalogue):
+    catalogue: dict = app.load_product_catalogue('db')
+    assert app.search_product_catalogue(catalogue, '') == []
+    assert app.search_product_catalogue(catalogue, 'farm\nelectricity') == []
+    assert app.search_product_catalogue(catalogue, 'farmelectricity') == []
+
+
+def test_search_matches_substring_search_of_all_names(app, bd, catalogue, build_product_catalogue):
+    rng = np.random.default_rng(42)
+    catalogue['names'] = [''.join(rng.choice(list('abc '), size=rng.integers(1, 8))) for _ in range(300)]
+    catalogue['ids'] = list(range(len(catalogue['names'])))
+    catalogue['locations'] = [None] * len(catalogue['names'])
+    catalogue: dict = app.load_product_catalogue('db')
+    for query in ['a', 'b', 'ab', 'c a', 'abc', 'cc', 'bab']:
+        list_results: list = app.search_product_catalogue(catalogue, query, max_results=len(catalogue['names']))
+        list_prefix: list = [index for index in list_results if catalogue['names'][index].startswith(query)]
+        assert len(list_results) == len(set(list_results))
+        assert set(list_results) == {index for index, name in enumerate(catalogue['names']) if query in name}
+        assert list_results[:len(list_prefix)] == list_prefix
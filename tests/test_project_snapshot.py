@@ -0,0 +1,126 @@
+"""
+Checks of the pre-built project snapshots
+(see `get_project_snapshot` and `restore_project_snapshot` in `app/index.py`).
+
+`bw2data` and `bw2io` are replaced by directories in `tmp_path`, so that no Brightway project is changed.
+Remote snapshots are "downloaded" from a local directory.
+"""
+import hashlib
+import io
+import tarfile
+import types
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def bd(app, monkeypatch, tmp_path):
+    """
+    Replaces `bw2data` by the Brightway directory `tmp_path / 'brightway'`,
+    and records the projects activated with `bd.projects.set_current`.
+    """
+    (tmp_path / 'brightway').mkdir()
+    projects = types.SimpleNamespace(_base_data_dir=str(tmp_path / 'brightway'), current='default', list_activated=[])
+    projects.set_current = lambda name, update=True: projects.list_activated.append(name)
+    bd = types.SimpleNamespace(projects=projects, utils=types.SimpleNamespace(safe_filename=lambda name, full: name))
+    monkeypatch.setattr(app, 'bd', bd)
+    return bd
+
+
+@pytest.fixture
+def bi(app, monkeypatch, tmp_path):
+    """
+    Replaces `bw2io` by the cache directory `tmp_path / 'cache'`, and the server by the directory `tmp_path / 'server'`.
+    Returns the list of the downloaded file names.
+    """
+    (tmp_path / 'cache').mkdir()
+    (tmp_path / 'server').mkdir()
+    list_downloads: list = []
+
+    def download_with_progressbar(url: str, filename: str, dirpath: str) -> None:
+        path = tmp_path / 'server' / url.rsplit('/', 1)[-1]
+        if not path.is_file():
+            raise ValueError(f'Failed to retrieve {url}')
+        list_downloads.append(filename)
+        (Path(dirpath) / filename).write_bytes(path.read_bytes())
+
+    monkeypatch.setattr(app, 'bi', types.SimpleNamespace(
+        remote=types.SimpleNamespace(cache_dir=str(tmp_path / 'cache')),
+        download_utils=types.SimpleNamespace(download_with_progressbar=download_with_progressbar),
+    ))
+    return list_downloads
+
+
+def write_snapshot(path: Path, dict_files: dict, sha256: str | None = None) -> None:
+    """
+    Writes a snapshot with the files `dict_files` (by path in the project directory) below the top-level directory 'P.1234',
+    and its checksum file, with the checksum `sha256` if given.
+    """
+    with tarfile.open(path, 'w:gz') as tar:
+        for name, content in dict_files.items():
+            info = tarfile.TarInfo(f'P.1234/{name}')
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    sha256 = sha256 or hashlib.sha256(path.read_bytes()).hexdigest()
+    Path(f'{path}.sha256').write_text(f'{sha256.upper()}  {path.name}\n')
+
+
+def test_file_sha256_is_read_in_chunks(app, tmp_path):
+    content: bytes = bytes(range(256)) * (2**13 + 3) # more than two chunks of 1 MiB
+    (tmp_path / 'file').write_bytes(content)
+    assert app.get_file_sha256(tmp_path / 'file') == hashlib.sha256(content).hexdigest()
+
+
+def test_local_snapshot_is_verified(app, monkeypatch, bi, tmp_path):
+    path = tmp_path / 'P.tar.gz'
+    monkeypatch.setitem(app.dict_project_snapshots, 'P', str(path))
+    write_snapshot(path, {'lci/databases.db': b'database'})
+    assert app.get_project_snapshot('P') == path
+
+    write_snapshot(path, {'lci/databases.db': b'database'}, sha256='0' * 64)
+    assert app.get_project_snapshot('P') is None
+    assert path.is_file() # local snapshots are never deleted
+    assert app.get_project_snapshot('Q') is None
+
+
+def test_remote_snapshot_is_downloaded_once_and_deleted_if_invalid(app, monkeypatch, bi, tmp_path):
+    monkeypatch.setitem(app.dict_project_snapshots, 'P', 'https://example.org/snapshots/P.tar.gz')
+    write_snapshot(tmp_path / 'server' / 'P.tar.gz', {'lci/databases.db': b'database'})
+    assert app.get_project_snapshot('P') == tmp_path / 'cache' / 'P.tar.gz'
+    assert app.get_project_snapshot('P') == tmp_path / 'cache' / 'P.tar.gz'
+    assert bi == ['P.tar.gz.sha256', 'P.tar.gz']
+
+    (tmp_path / 'cache' / 'P.tar.gz').write_bytes(b'interrupted download')
+    assert app.get_project_snapshot('P') is None
+    assert list((tmp_path / 'cache').iterdir()) == []
+
+    (tmp_path / 'server' / 'P.tar.gz').unlink()
+    assert app.get_project_snapshot('P') is None
+
+
+def test_snapshot_is_restored_into_project_directory(app, monkeypatch, bd, bi, tmp_path):
+    path = tmp_path / 'P.tar.gz'
+    monkeypatch.setitem(app.dict_project_snapshots, 'P', str(path))
+    write_snapshot(path, {'lci/databases.db': b'database', 'processed/db.zip': b'datapackage'})
+    path_project = tmp_path / 'brightway' / 'P'
+    (path_project / 'lci').mkdir(parents=True)
+    (path_project / 'lci' / 'left-over.db').write_bytes(b'interrupted installation')
+
+    assert app.restore_project_snapshot('P')
+    assert sorted(str(path.relative_to(path_project)) for path in path_project.rglob('*') if path.is_file()) == [
+        'lci/databases.db',
+        'processed/db.zip',
+    ]
+    assert (path_project / 'lci' / 'databases.db').read_bytes() == b'database'
+    assert sorted(path.name for path in (tmp_path / 'brightway').iterdir()) == ['P'] # no temporary directory is left
+    assert bd.projects.list_activated == ['P', 'default']
+
+
+def test_project_is_not_restored_without_valid_snapshot(app, monkeypatch, bd, bi, tmp_path):
+    path = tmp_path / 'P.tar.gz'
+    monkeypatch.setitem(app.dict_project_snapshots, 'P', str(path))
+    write_snapshot(path, {'lci/databases.db': b'database'}, sha256='0' * 64)
+    assert not app.restore_project_snapshot('P')
+    assert list((tmp_path / 'brightway').iterdir()) == []
+    assert bd.projects.list_activated == []
@@ -0,0 +1,76 @@
+"""
+Checks of the graph traversal which can be resumed with a lower cutoff
+(see `get_resumable_graph_traversal_class` in `app/index.py`).
+
+Cumulative scores of the edges of the LCA model of `tests/conftest.py`, as fractions of the total score (2.84):
+product 1 (0.50), product 2 (0.15, below both product 0 and product 1) and product 3 (0.04, below every product 2).
+"""
+import numpy as np
+import pytest
+
+import bw_graph_tools as bgt
+
+
+def get_traversal_by_path(traversal: dict) -> dict:
+    """
+    Returns the supply, direct and cumulative score of the nodes of a graph traversal (see `create_graph_traversal_arrays`),
+    indexed by the activity ids along the path from the root node, since the `unique_id` depends on the order of traversal.
+    """
+    dict_paths: dict = {-1: ()}
+    dict_nodes: dict = {}
+    for index, unique_id in enumerate(traversal['unique_id']):
+        dict_paths[unique_id] = dict_paths[traversal['parent'][index]] + (traversal['activity_id'][index],)
+        dict_nodes[dict_paths[unique_id]] = (
+            traversal['supply'][index],
+            traversal['direct'][index],
+            traversal['cumulative'][index],
+        )
+    return dict_nodes
+
+
+def create_traversal(app, lca, cutoff: float):
+    traversal = app.get_resumable_graph_traversal_class()(lca, bgt.GraphTraversalSettings(cutoff=cutoff))
+    traversal.traverse()
+    return traversal
+
+
+def assert_traversals_equal(traversal: dict, traversal_expected: dict) -> None:
+    dict_nodes: dict = get_traversal_by_path(traversal)
+    dict_nodes_expected: dict = get_traversal_by_path(traversal_expected)
+    assert dict_nodes.keys() == dict_nodes_expected.keys()
+    for path, values in dict_nodes_expected.items():
+        assert dict_nodes[path] == pytest.approx(values, rel=1e-12)
+
+
+def test_coarse_traversal_prunes_edges_below_cutoff(app, lca):
+    traversal = create_traversal(app, lca, cutoff=0.1)
+    arrays: dict = traversal.get_traversal_arrays(cutoff=0.1)
+    assert len(arrays['unique_id']) == 4
+    assert not np.isin(14, arrays['activity_id'])
+    assert len(traversal.list_pruned_edges) == 2
+
+
+@pytest.mark.parametrize('cutoff', [0.05, 0.01])
+def test_resumed_traversal_equals_full_traversal(app, lca, cutoff):
+    traversal = create_traversal(app, lca, cutoff=0.1)
+    traversal.resume(cutoff=cutoff)
+    assert_traversals_equal(
+        traversal.get_traversal_arrays(cutoff=cutoff),
+        create_traversal(app, lca, cutoff=cutoff).get_traversal_arrays(cutoff=cutoff)
+    )
+
+
+def test_filtered_traversal_equals_coarse_traversal(app, lca):
+    traversal = create_traversal(app, lca, cutoff=0.01)
+    assert_traversals_equal(
+        traversal.get_traversal_arrays(cutoff=0.1),
+        create_traversal(app, lca, cutoff=0.1).get_traversal_arrays(cutoff=0.1)
+    )
+
+
+def test_resumed_traversal_marks_expanded_nodes_as_not_terminal(app, lca):
+    traversal = create_traversal(app, lca, cutoff=0.1)
+    traversal.resume(cutoff=0.01)
+    set_consumers: set = {edge.consumer_unique_id for edge in traversal._edges}
+    for unique_id, node in traversal._nodes.items():
+        assert node.terminal == (unique_id not in set_consumers)
@@ -0,0 +1,121 @@
+"""
+Checks of the scope analysis of the graph traversal
+(see `nodes_dict_to_dataframe` and `determine_scope_emissions` in `app/index.py`).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def traversal() -> dict:
+    """
+    Arrays of a graph traversal (see `create_graph_traversal_arrays`) of activity 53 ('Electricity; at consumer' in USEEIO-1.1),
+    which is a scope 2 activity, but as reference product a scope 1 node. Activity 53 is also used further down the supply chain.
+    """
+    return {
+        'unique_id': np.array([0, 1, 2, 3, 4]),
+        'activity_id': np.array([53, 7, 53, 9, 7]),
+        'supply': np.array([100.0, 20.0, 5.0, 2.0, 0.5]),
+        'direct': np.array([10.0, 4.0, 0.5, 1.0, 0.1]),
+        'direct_outside_flows': np.zeros(5),
+        'depth': np.array([1, 2, 2, 3, 3]),
+    }
+
+
+def get_node_metadata(ids: list) -> pd.DataFrame:
+    return pd.DataFrame({'name': [f'Commodity {node_id}' for node_id in set(ids)]}, index=pd.Index(list(set(ids)), name='id'))
+
+
+def test_scope_2_activities_of_configured_database(app, monkeypatch):
+    monkeypatch.setitem(app.dict_scope_2_activity_ids, 'db', [31, 7, 31])
+    np.testing.assert_array_equal(app.get_scope_2_activity_ids('db'), [7, 31])
+    np.testing.assert_array_equal(app.get_scope_2_activity_ids('USEEIO-1.1'), [53])
+
+
+@pytest.mark.parametrize('name, is_scope_2', [
+    ('Electricity, high voltage', True),
+    ('Heat, district or industrial', True),
+    ('Steam and air conditioning supply', True),
+    ('District cooling', True),
+    ('electricity production, hard coal', True),
+    ('Wheat grains', False),
+    ('Electrical equipment', False),
+    ('Electric lighting equipment', False),
+])
+def test_scope_2_activity_names(app, name, is_scope_2):
+    assert bool(app.regex_scope_2_activity_names.search(name)) == is_scope_2
+
+
+def test_nodes_are_assigned_to_scopes(app, monkeypatch, traversal):
+    monkeypatch.setattr(app, 'get_node_metadata', get_node_metadata)
+    df: pd.DataFrame = app.nodes_dict_to_dataframe(traversal, np.array([9, 53]))
+    assert df['Scope'].tolist() == [1, 3, 2, 2, 3]
+    assert df['Name'].tolist() == ['Commodity 53', 'Commodity 7', 'Commodity 53', 'Commodity 9', 'Commodity 7']
+    np.testing.assert_allclose(df['BurdenIntensity'], traversal['direct'] / traversal['supply'])
+
+    df = app.nodes_dict_to_dataframe(traversal, np.array([], dtype=int))
+    assert df['Scope'].tolist() == [1, 3, 3, 3, 3]
+
+
+@pytest.fixture
+def df_nodes() -> pd.DataFrame:
+    """
+    Random tabulator dataframe of a graph traversal, with scopes edited by the user (strings and invalid values),
+    and negative burdens.
+    """
+    rng = np.random.default_rng(42)
+    count: int = 500
+    array_activity_id = rng.integers(0, 40, size=count)
+    return pd.DataFrame({
+        'Scope': rng.choice(np.array([1, 2, 3, '2', 'x'], dtype=object), size=count, p=[0.01, 0.1, 0.8, 0.04, 0.05]),
+        'Depth': rng.integers(1, 8, size=count),
+        'Name': [f'Commodity {activity_id}' for activity_id in array_activity_id],
+        'activity_datapackage_id': array_activity_id,
+        'Burden(Direct)': rng.normal(1.0, 2.0, size=count),
+    })
+
+
+def test_scope_emissions_match_groupby(app, df_nodes):
+    dict_scope: dict = app.determine_scope_emissions(df_nodes, int_top_activities=5)
+
+    df = df_nodes.assign(Scope=pd.to_numeric(df_nodes['Scope'], errors='coerce').fillna(3).astype(int))
+    series_scope = df.groupby('Scope')['Burden(Direct)'].sum()
+    assert dict_scope['Scope'] == pytest.approx({f'Scope {scope}': series_scope[scope] for scope in [1, 2, 3]})
+
+    df_depth = df.pivot_table(index='Depth', columns='Scope', values='Burden(Direct)', aggfunc='sum', fill_value=0)
+    np.testing.assert_allclose(dict_scope['Depth'].to_numpy(), df_depth[[1, 2, 3]].to_numpy())
+    np.testing.assert_array_equal(dict_scope['Depth'].index, df_depth.index)
+
+    df_activities = df.groupby(['Scope', 'activity_datapackage_id'], as_index=False)['Burden(Direct)'].sum()
+    df_activities = (
+        df_activities
+        .assign(Absolute=df_activities['Burden(Direct)'].abs())
+        .sort_values(['Scope', 'Absolute'], ascending=[True, False])
+        .groupby('Scope')
+        .head(5)
+    )
+    assert dict_scope['Activities']['Scope'].tolist() == df_activities['Scope'].tolist()
+    assert dict_scope['Activities']['Name'].tolist() == [
+        f'Commodity {activity_id}' for activity_id in df_activities['activity_datapackage_id']
+    ]
+    np.testing.assert_allclose(dict_scope['Activities']['Burden(Direct)'], df_activities['Burden(Direct)'])
+    np.testing.assert_allclose(
+        dict_scope['Activities']['Share'],
+        df_activities['Burden(Direct)'] / df_nodes['Burden(Direct)'].sum()
+    )
+
+
+def test_scope_emissions_of_root_node_only(app):
+    df = pd.DataFrame({
+        'Scope': [1],
+        'Depth': [1],
+        'Name': ['Commodity 3'],
+        'activity_datapackage_id': [3],
+        'Burden(Direct)': [0.0],
+    })
+    dict_scope: dict = app.determine_scope_emissions(df)
+    assert dict_scope['Scope'] == {'Scope 1': 0.0, 'Scope 2': 0.0, 'Scope 3': 0.0}
+    assert dict_scope['Depth'].index.tolist() == [1]
+    assert dict_scope['Activities']['Scope'].tolist() == [1]
+    assert np.isnan(dict_scope['Activities']['Share']).all()
@@ -0,0 +1,89 @@
+"""
+Checks of the sensitivities of the LCA score to the technosphere coefficients
+(see `compute_exchange_sensitivities` in `app/index.py`) against finite differences.
+"""
+import copy
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+
+@pytest.fixture(params=['dense', 'sparse'])
+def lca_solver(request, app, monkeypatch, lca):
+    """
+    Copy of the in-memory LCA model of a method, solved with the dense inverse (see `dense_inverse_solver_class`),
+    or with the factorized technosphere matrix and its transposed solver, cached for a project of its own.
+    """
+    lca = copy.copy(lca)
+    lca.method = ('method',)
+    if request.param == 'dense':
+        lca.solver = app.dense_inverse_solver_class(lca.technosphere_matrix)
+    else:
+        lca.decompose_technosphere()
+        monkeypatch.setattr(app, 'bd', types.SimpleNamespace(projects=types.SimpleNamespace(current=f'test-{id(lca)}')))
+    return lca
+
+
+def get_score(lca, matrix_technosphere: sparse.spmatrix) -> float:
+    array_intensity: np.ndarray = lca.biosphere_matrix.T @ lca.characterization_matrix.diagonal()
+    return float(array_intensity @ sparse.linalg.spsolve(matrix_technosphere.tocsc(), lca.demand_array))
+
+
+def test_sensitivities_match_finite_differences(app, lca_solver):
+    dict_sensitivity: dict = app.compute_exchange_sensitivities(lca_solver, lca_solver.demand)
+    assert dict_sensitivity['score'] == pytest.approx(lca_solver.score, rel=1e-12)
+
+    float_step: float = 1e-6
+    for index, (row, column) in enumerate(zip(dict_sensitivity['rows'], dict_sensitivity['columns'])):
+        list_scores: list = []
+        for factor in [1 + float_step, 1 - float_step]:
+            matrix = lca_solver.technosphere_matrix.tolil(copy=True)
+            matrix[row, column] *= factor
+            list_scores.append(get_score(lca_solver, matrix))
+        float_sensitivity: float = (list_scores[0] - list_scores[1]) / (2 * float_step * lca_solver.score)
+        assert dict_sensitivity['sensitivity'][index] == pytest.approx(float_sensitivity, rel=1e-6, abs=1e-9)
+
+
+def test_sensitivities_of_production_exchanges(app, lca_solver):
+    dict_sensitivity: dict = app.compute_exchange_sensitivities(lca_solver, lca_solver.demand)
+    np.testing.assert_array_equal(dict_sensitivity['is_production'], dict_sensitivity['rows'] == dict_sensitivity['columns'])
+    # scaling a whole column of the technosphere matrix scales the supply of the activity inversely,
+    # which changes the score by the share of the direct emissions of the activity
+    array_intensity: np.ndarray = lca_solver.biosphere_matrix.T @ lca_solver.characterization_matrix.diagonal()
+    for column in range(4):
+        is_column = dict_sensitivity['columns'] == column
+        assert dict_sensitivity['sensitivity'][is_column].sum() == pytest.approx(
+            -array_intensity[column] * dict_sensitivity['supply'][column] / dict_sensitivity['score'], rel=1e-12
+        )
+
+
+def test_sensitivity_ranking_excludes_production_exchanges(app, monkeypatch, lca_solver):
+    monkeypatch.setattr(app, 'get_node_metadata', lambda ids: pd.DataFrame(
+        {'name': [f'Node {node_id}' for node_id in set(ids)]},
+        index=list(set(ids))
+    ))
+    dict_sensitivity: dict = app.compute_exchange_sensitivities(lca_solver, lca_solver.demand)
+    df: pd.DataFrame = app.create_sensitivity_ranking(lca_solver, dict_sensitivity, int_top_exchanges=3)
+    # input of product 1 to activity 0 (sensitivity 0.50), of product 2 to activity 0 and to activity 1 (0.15 each)
+    assert df['Product'].tolist() == ['Node 2', 'Node 3', 'Node 3']
+    assert sorted(df['Consumer']) == ['Node 11', 'Node 11', 'Node 12']
+    np.testing.assert_allclose(df['Amount'][0], 0.5)
+    np.testing.assert_allclose(sorted(df['Amount'][1:]), [0.1, 0.2])
+    assert (np.diff(np.abs(df['Sensitivity'])) <= 0).all()
+
+
+def test_traversal_sensitivities_are_those_of_the_edges(app, lca_solver, traversal):
+    df, tree = traversal
+    dict_sensitivity: dict = app.compute_exchange_sensitivities(lca_solver, lca_solver.demand)
+    array_sensitivity: np.ndarray = app.get_traversal_sensitivities(lca_solver, tree, df, dict_sensitivity)
+    dict_exchanges: dict = dict(zip(
+        zip(dict_sensitivity['rows'], dict_sensitivity['columns']),
+        dict_sensitivity['sensitivity']
+    ))
+    assert array_sensitivity[0] == 1
+    for uid in range(1, 6):
+        edge: tuple = (tree['product_index'][uid], tree['activity_index'][tree['parent'][uid]])
+        assert array_sensitivity[uid] == pytest.approx(dict_exchanges[edge], rel=1e-12)